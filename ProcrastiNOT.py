@@ -4,18 +4,38 @@ import sys
 import os
 import configparser
 import threading
-from datetime import datetime, time as dt_time
+from datetime import date, datetime, time as dt_time
 import time
 import platform
+import uuid
+from collections import OrderedDict
+
+# Точка отсчёта для журнала запуска: берём до импорта PyQt6, он самый дорогой
+STARTUP_T0 = time.perf_counter()
 
 from PyQt6.QtWidgets import (
     QApplication, QWidget, QLabel, QPushButton, QVBoxLayout, QHBoxLayout,
     QGridLayout, QSystemTrayIcon, QMenu, QGroupBox, QSpinBox, QCheckBox,
-    QLineEdit, QFileDialog, QMessageBox
+    QLineEdit, QFileDialog, QMessageBox, QComboBox, QInputDialog, QStyle,
+    QTableWidget, QTableWidgetItem, QHeaderView, QTabWidget
 )
-from PyQt6.QtGui import QPixmap, QIcon, QPainter, QColor, QFont, QBrush, QPen, QAction, QPainterPath
-from PyQt6.QtCore import Qt, QTimer, QPropertyAnimation, QEasingCurve, QRect, QPoint, QSize, QUrl, pyqtSignal
+from PyQt6.QtGui import QPixmap, QIcon, QPainter, QColor, QFont, QFontMetrics, QBrush, QPen, QAction, QPainterPath, QDesktopServices
+from PyQt6.QtCore import Qt, QObject, QTimer, QPropertyAnimation, QEasingCurve, QRect, QPoint, QSize, QUrl, QMetaType, QResource, QFile, pyqtSignal, pyqtSlot
 from PyQt6.QtMultimedia import QSoundEffect 
+try:
+    # Тип нужно зарегистрировать до объявления слотов D-Bus; сам QtDBus необязателен
+    from PyQt6.QtDBus import QDBusMessage
+except ImportError:
+    QDBusMessage = None
+
+from procrastinot_sync import SyncClient, DEFAULT_SYNC_PORT
+from procrastinot_state import MODES, STATE_FILE, save_state, load_state, touch_state, local_day, new_totals, account_phase, phase_bucket
+from procrastinot_control import ControlServer, CONTROL_COMMANDS, CONTROL_REPLY_TIMEOUT
+from procrastinot_dashboard import DashboardServer, DEFAULT_DASHBOARD_PORT
+from procrastinot_tasks import TaskLedger, NO_TASK
+from procrastinot_clock import ClockService, SUSPEND_POLICIES
+from procrastinot_stats import StatsStore, PERIODS, daily_rollup, extend_to, regroup, trends
+from procrastinot_autostart import AUTOSTART_FLAG, StartupLog, workdir_from_args, set_enabled as set_autostart_enabled, is_enabled as is_autostart_enabled
 
 # --- Вспомогательные функции и константы (в основном без изменений) ---
 
@@ -23,18 +43,23 @@ def resource_path(relative_path):
     try:
         base_path = sys._MEIPASS
     except Exception:
-        base_path = os.path.abspath(".")
+        # Каталог скрипта, а не текущий: запуск из другого каталога не ломает поиск ресурсов
+        base_path = os.path.dirname(os.path.abspath(__file__))
     return os.path.join(base_path, relative_path)
 
-APP_ICON_PNG = resource_path('assets/app_icon.png')
-DEFAULT_ICON_PATH = APP_ICON_PNG
-NOTIFICATION_APP_ICON_PATH = APP_ICON_PNG
-DEFAULT_SOUND_PATH = resource_path('assets/notification.wav')
+APP_ICON_PNG = 'assets/app_icon.png'
+DEFAULT_SOUND_PATH = 'assets/notification.wav'
+ASSETS_BUNDLE_FILE = 'assets.rcc'
 CONFIG_FILE = 'settings.ini'
 
 APP_FONT_FAMILY = "Montserrat"
 FALLBACK_FONT_FAMILY = "Segoe UI" # Более подходящий для Windows
 
+NOTIFICATION_BACKENDS = {
+    "custom": "Встроенные",
+    "freedesktop": "Системные (D-Bus)",
+}
+
 # Стилевые конфиги для логики, а не для прямого рендеринга
 STYLE_CONFIGS = {
     "work": {"timer_fg": "#f3a500"},
@@ -57,6 +82,182 @@ TRAY_ICON_IDLE_FG = "#777777"
 TRAY_ICON_WORK_PROMPT_BG = "#64a4d9"
 TRAY_ICON_WORK_PROMPT_FG = "#000000"
 
+# Цвета иконки для фаз с обратным отсчётом (для заготовки последних секунд)
+TRAY_ICON_COUNTDOWN_COLORS = {
+    "work": (TRAY_ICON_WORK_BG, TRAY_ICON_WORK_FG),
+    "rest": (TRAY_ICON_REST_BG, TRAY_ICON_REST_FG),
+    "postponed": (TRAY_ICON_POSTPONED_BG, TRAY_ICON_POSTPONED_FG),
+}
+TRAY_ICON_COUNTDOWN_SECONDS = 5
+TRAY_ICON_CACHE_SIZE = 128
+
+DBUS_TIMER_UPDATE_SECONDS = 60        # Чаще обновлять текст системного уведомления незачем
+
+NOTIFICATION_COALESCE_MS = 120         # Запросы в пределах окна сливаются в один показ
+NOTIFICATION_MIN_RECREATE_MS = 600     # Не чаще одного нового окна уведомления за это время
+
+STARTUP_STAGE_GAP_MS = 700  # Пауза между этапами отложенного запуска
+
+TASK_FLUSH_BATCH = 10                 # Сохраняем журнал задач раз в N изменений...
+TASK_FLUSH_INTERVAL_MS = 5 * 60 * 1000  # ...или раз в 5 минут
+STATE_ALIVE_INTERVAL_MS = 60 * 1000     # Как часто отмечать в снимке, что приложение ещё работает
+TASK_MENU_SIZE = 10
+STATS_TREND_DAYS = 7  # Окно скользящих трендов в окне статистики
+
+
+class AssetRegistry:
+    """
+    Единая точка доступа к ресурсам. Каждый файл читается один раз, масштабированные
+    варианты кэшируются по (размер, devicePixelRatio). Если рядом лежит собранный
+    assets.rcc (см. assets.qrc), ресурсы берутся из него, а не из папки assets.
+    """
+    def __init__(self):
+        self.use_bundle = False
+        bundle = resource_path(ASSETS_BUNDLE_FILE)
+        if os.path.exists(bundle):
+            self.use_bundle = QResource.registerResource(bundle)
+        self._pixmaps = {}
+        self._scaled = {}
+        self._icons = {}
+
+    def path(self, name):
+        return f":/{name}" if self.use_bundle else resource_path(name)
+
+    def url(self, name):
+        return QUrl(f"qrc:/{name}") if self.use_bundle else QUrl.fromLocalFile(resource_path(name))
+
+    def file_path(self, name):
+        """ Путь на диске (для внешних потребителей вроде сервера уведомлений) или "" """
+        path = resource_path(name)
+        return path if os.path.exists(path) else ""
+
+    def exists(self, name):
+        return QFile.exists(self.path(name))
+
+    def pixmap(self, name, size=None, dpr=1.0):
+        if name not in self._pixmaps:
+            self._pixmaps[name] = QPixmap(self.path(name))
+        if size is None:
+            return self._pixmaps[name]
+        key = (name, size, dpr)
+        if key not in self._scaled:
+            scaled = self._pixmaps[name].scaled(
+                round(size * dpr), round(size * dpr),
+                Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation
+            )
+            scaled.setDevicePixelRatio(dpr)
+            self._scaled[key] = scaled
+        return self._scaled[key]
+
+    def icon(self, name):
+        if name not in self._icons:
+            self._icons[name] = QIcon(self.pixmap(name))
+        return self._icons[name]
+
+    def sound_url(self, path):
+        """ URL звука: встроенный ресурс для стандартного файла, иначе файл на диске (или None) """
+        if path.replace("\\", "/") == DEFAULT_SOUND_PATH or os.path.abspath(path) == os.path.abspath(resource_path(DEFAULT_SOUND_PATH)):
+            return self.url(DEFAULT_SOUND_PATH) if self.exists(DEFAULT_SOUND_PATH) else None
+        return QUrl.fromLocalFile(os.path.abspath(path)) if os.path.exists(path) else None
+
+    def preload(self, dpr=1.0):
+        """ Загружает всё, что нужно окнам и уведомлениям, до их создания """
+        self.icon(APP_ICON_PNG)
+        self.pixmap(APP_ICON_PNG, 22, dpr)
+
+ASSETS = AssetRegistry()
+
+
+class TrayIconRenderer:
+    """
+    Рисует иконку трея сразу в нужных размерах: размеры и devicePixelRatio экранов
+    запрашиваются один раз, а QIcon содержит по пиксмапу на каждый размер, так что
+    системе не нужно масштабировать картинку. Готовые иконки лежат в LRU-кэше, а кадры
+    обратного отсчёта — отдельно от него, чтобы их не вытеснили.
+    """
+    def __init__(self, app):
+        self.app = app
+        self._cache = OrderedDict()
+        self._strip = {}           # Кадры отсчёта текущей фазы, вне LRU
+        self._strip_args = None    # (тексты, фон, цвет) для перерисовки после reset()
+        self.shown_key = None      # (текст, фон, цвет) иконки, которая сейчас стоит в трее
+        self.sizes = ()
+        self.dpr = 1.0
+        self.reset()
+        # Сменился экран или масштаб — пересчитываем размеры и сбрасываем кэш
+        app.primaryScreenChanged.connect(lambda *_: self.reset())
+        app.screenAdded.connect(lambda *_: self.reset())
+
+    def reset(self):
+        small = self.app.style().pixelMetric(QStyle.PixelMetric.PM_SmallIconSize)
+        # Трей на разных платформах просит 16, 22, 24 или 32 логических пикселя
+        self.sizes = tuple(sorted({small, 22, 24, 32}))
+        self.dpr = max((screen.devicePixelRatio() for screen in self.app.screens()), default=1.0)
+        self._cache.clear()
+        self._strip = {}
+        # Иконка в трее нарисована под старые размеры — при следующем тике её нужно заменить
+        self.shown_key = None
+        if self._strip_args:
+            self.prebuild(*self._strip_args)
+
+    def icon(self, text, bg_color, fg_color):
+        key = (text, bg_color, fg_color)
+        icon = self._strip.get(key)
+        if icon is not None:
+            return icon
+        icon = self._cache.get(key)
+        if icon is not None:
+            self._cache.move_to_end(key)
+            return icon
+        icon = self._build(text, bg_color, fg_color)
+        self._cache[key] = icon
+        if len(self._cache) > TRAY_ICON_CACHE_SIZE:
+            self._cache.popitem(last=False)
+        return icon
+
+    def prebuild(self, texts, bg_color, fg_color):
+        """ Заранее рисует кадры отсчёта, чтобы в нужный момент осталось только поменять иконку """
+        texts = tuple(texts)
+        self._strip_args = (texts, bg_color, fg_color)
+        strip = {}
+        for text in texts:
+            key = (text, bg_color, fg_color)
+            strip[key] = self._strip.get(key) or self._build(text, bg_color, fg_color)
+        self._strip = strip
+
+    def _build(self, text, bg_color, fg_color):
+        icon = QIcon()
+        for size in self.sizes:
+            icon.addPixmap(self._render(text, bg_color, fg_color, size))
+        return icon
+
+    def _render(self, text, bg_color, fg_color, size):
+        side = round(size * self.dpr)
+        pixmap = QPixmap(side, side)
+        pixmap.fill(Qt.GlobalColor.transparent)
+
+        painter = QPainter(pixmap)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        painter.setRenderHint(QPainter.RenderHint.TextAntialiasing)
+
+        path = QPainterPath()
+        path.addRoundedRect(0, 0, side, side, side * 0.19, side * 0.19)
+        painter.fillPath(path, QBrush(QColor(bg_color)))
+
+        # Пропорции прежней иконки 64x64 с шрифтом 28pt; длинный текст ужимаем по ширине
+        font = QFont(APP_FONT_FAMILY, 1, QFont.Weight.Bold)
+        font.setPixelSize(max(1, round(side * 0.58)))
+        width = QFontMetrics(font).horizontalAdvance(text)
+        if width > side * 0.92:
+            font.setPixelSize(max(1, int(font.pixelSize() * side * 0.92 / width)))
+        painter.setFont(font)
+        painter.setPen(QPen(QColor(fg_color)))
+        painter.drawText(pixmap.rect(), Qt.AlignmentFlag.AlignCenter, text)
+        painter.end()
+
+        pixmap.setDevicePixelRatio(self.dpr)
+        return pixmap
+
 
 # Класс ConfigManager остается практически без изменений
 class ConfigManager:
@@ -80,6 +281,22 @@ class ConfigManager:
         self.icon_update_rate = self.config.getint('Timers', 'icon_update_rate_seconds', fallback=1)
         if self.icon_update_rate < 1: self.icon_update_rate = 1
         self.notif_timeout = self.config.getint('Timers', 'notif_timeout', fallback=5)
+        self.notif_backend = self.config.get('Notifications', 'backend', fallback='custom')
+        if self.notif_backend not in NOTIFICATION_BACKENDS: self.notif_backend = 'custom'
+        self.sync_enabled = self.config.getboolean('Sync', 'enabled', fallback=False)
+        self.sync_host = self.config.get('Sync', 'relay_host', fallback='127.0.0.1')
+        self.sync_port = self.config.getint('Sync', 'relay_port', fallback=DEFAULT_SYNC_PORT)
+        self.suspend_policy = self.config.get('Clock', 'suspend_policy', fallback='rest')
+        if self.suspend_policy not in SUSPEND_POLICIES: self.suspend_policy = 'rest'
+        self.long_suspend_minutes = self.config.getint('Clock', 'long_suspend_minutes', fallback=10)
+        if self.long_suspend_minutes < 1: self.long_suspend_minutes = 1
+        self.dashboard_enabled = self.config.getboolean('Dashboard', 'enabled', fallback=False)
+        self.dashboard_port = self.config.getint('Dashboard', 'port', fallback=DEFAULT_DASHBOARD_PORT)
+        self.sync_node_id = (self.config.get('Sync', 'node_id', fallback='')
+                             or getattr(self, 'sync_node_id', '') or uuid.uuid4().hex[:12])
+        self.autostart_enabled = self.config.getboolean('Autostart', 'enabled', fallback=False)
+        self.startup_delay = self.config.getint('Autostart', 'startup_delay_seconds', fallback=15)
+        self.startup_delay = min(max(self.startup_delay, 0), 600)
 
     def create_default_config(self):
         self.config['Timers'] = {
@@ -95,6 +312,27 @@ class ConfigManager:
             'active_start_hour': '9',
             'active_end_hour': '18'
         }
+        self.config['Notifications'] = {
+            'backend': 'custom'
+        }
+        self.config['Dashboard'] = {
+            'enabled': 'False',
+            'port': str(DEFAULT_DASHBOARD_PORT)
+        }
+        self.config['Clock'] = {
+            'suspend_policy': 'rest',
+            'long_suspend_minutes': '10'
+        }
+        self.config['Sync'] = {
+            'enabled': 'False',
+            'relay_host': '127.0.0.1',
+            'relay_port': str(DEFAULT_SYNC_PORT),
+            'node_id': uuid.uuid4().hex[:12]
+        }
+        self.config['Autostart'] = {
+            'enabled': 'False',
+            'startup_delay_seconds': '15'
+        }
         # Записываем созданный конфиг напрямую в файл
         with open(self.filename, 'w') as cf:
             self.config.write(cf)
@@ -109,6 +347,18 @@ class ConfigManager:
         self.config['Schedule'] = {
             'active_start_hour': str(self.active_start_hour), 'active_end_hour': str(self.active_end_hour)
         }
+        self.config['Notifications'] = {'backend': self.notif_backend}
+        self.config['Dashboard'] = {'enabled': str(self.dashboard_enabled), 'port': str(self.dashboard_port)}
+        self.config['Clock'] = {
+            'suspend_policy': self.suspend_policy, 'long_suspend_minutes': str(self.long_suspend_minutes)
+        }
+        self.config['Sync'] = {
+            'enabled': str(self.sync_enabled), 'relay_host': self.sync_host,
+            'relay_port': str(self.sync_port), 'node_id': self.sync_node_id
+        }
+        self.config['Autostart'] = {
+            'enabled': str(self.autostart_enabled), 'startup_delay_seconds': str(self.startup_delay)
+        }
         with open(self.filename, 'w') as cf: self.config.write(cf)
 
 # --- Новые классы на PyQt6 ---
@@ -127,7 +377,12 @@ class CustomNotification(QWidget):
         self.is_persistent = is_persistent
         self.timeout_ms = timeout_ms
         self.mode_key = mode_key
+        self.buttons_key = tuple(btn["id"] for btn in buttons_config or [])
+        self.closing = False
         self.animation = QPropertyAnimation(self, b"windowOpacity")
+        self.timeout_timer = QTimer(self)
+        self.timeout_timer.setSingleShot(True)
+        self.timeout_timer.timeout.connect(self._check_timeout)
 
         self.setWindowFlags(
             Qt.WindowType.FramelessWindowHint |
@@ -152,8 +407,11 @@ class CustomNotification(QWidget):
         self.fade_in()
 
         self.mouse_over = False
+        self.restart_timeout()
+
+    def restart_timeout(self):
         if not self.is_persistent:
-            QTimer.singleShot(self.timeout_ms, self._check_timeout)
+            self.timeout_timer.start(self.timeout_ms)
     
     def closeEvent(self, event):
         """ Переопределяем стандартный метод закрытия, чтобы отправить сигнал """
@@ -170,7 +428,7 @@ class CustomNotification(QWidget):
 
     def _check_timeout(self):
         if self.mouse_over and self.isVisible(): # Добавлена проверка isVisible()
-            QTimer.singleShot(1000, self._check_timeout)
+            self.timeout_timer.start(1000)
         else:
             self.fade_out()
 
@@ -198,8 +456,7 @@ class CustomNotification(QWidget):
 
         header_layout = QHBoxLayout()
         icon_label = QLabel()
-        pixmap = QPixmap(NOTIFICATION_APP_ICON_PATH).scaled(22, 22, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation)
-        icon_label.setPixmap(pixmap)
+        icon_label.setPixmap(ASSETS.pixmap(APP_ICON_PNG, 22, QApplication.primaryScreen().devicePixelRatio()))
         header_layout.addWidget(icon_label)
 
         self.title_label = QLabel(title_text)
@@ -317,6 +574,12 @@ class CustomNotification(QWidget):
     def update_timer(self, new_time_text):
         if self.isVisible():
             self.timer_label.setText(new_time_text)
+
+    def set_content(self, title_text, timer_text):
+        """ Обновление на месте, без пересоздания окна и анимации """
+        self.title_label.setText(title_text)
+        self.timer_label.setText(timer_text)
+        self.restart_timeout()
     
     def fade_in(self):
         self.animation.stop()
@@ -328,6 +591,8 @@ class CustomNotification(QWidget):
         self.animation.start()
 
     def fade_out(self):
+        self.closing = True
+        self.timeout_timer.stop()
         self.animation.stop()
         self.animation.setDuration(300)
         self.animation.setStartValue(self.windowOpacity())
@@ -346,22 +611,294 @@ class CustomNotification(QWidget):
         y = screen_geometry.bottom() - self.height() - 15
         self.move(x, y)
 
-class SettingsWindow(QWidget):
-    """ Красивое окно настроек на PyQt6 """
-    def __init__(self, parent_app):
+def dbus_slot(method):
+    """ pyqtSlot(QDBusMessage), если QtDBus доступен (без него бэкенд не создаётся) """
+    return pyqtSlot(QDBusMessage)(method) if QDBusMessage is not None else method
+
+
+class DBusNotification(QObject):
+    """
+    Лёгкая замена CustomNotification для системных уведомлений.
+    Повторяет её интерфейс (mode_key, update_timer, fade_out, close, closed),
+    но сама ничего не рисует: всё делает сервер уведомлений рабочего стола.
+    """
+    closed = pyqtSignal()
+
+    def __init__(self, backend, mode_key, title_text, timer_text, buttons_key=()):
         super().__init__()
-        self.parent_app = parent_app
-        self.config_manager = parent_app.config_manager
-        
-        self.setWindowTitle("Настройки")
-        self.setWindowIcon(QIcon(DEFAULT_ICON_PATH))
-        self.setGeometry(0, 0, 450, 500)
-        self.center()
-        self.setStyleSheet(self.get_stylesheet())
+        self.backend = backend
+        self.mode_key = mode_key
+        self.buttons_key = buttons_key
+        self.title_text = title_text
+        self.timer_text = timer_text
+        self.alive = True
 
-        self.setup_ui()
-        self.load_settings()
+    @property
+    def closing(self):
+        return not self.alive or self.backend.pending_close is self
 
+    def set_content(self, title_text, timer_text):
+        self.title_text = title_text
+        self.timer_text = timer_text
+        self.backend.update(self)
+
+    def isVisible(self):
+        return self.alive
+
+    def activateWindow(self):
+        pass
+
+    def update_timer(self, new_time_text):
+        if self.alive and new_time_text != self.timer_text:
+            self.timer_text = new_time_text
+            self.backend.update_timer(self)
+
+    def fade_out(self):
+        # Закрываем с задержкой: если следом придёт новое уведомление, оно заменит это по replaces_id
+        if self.alive:
+            self.backend.schedule_close(self)
+
+    def close(self):
+        if self.alive:
+            self.backend.close_now(self)
+
+    def _mark_closed(self):
+        if self.alive:
+            self.alive = False
+            self.closed.emit()
+
+
+class FreedesktopNotificationBackend(QObject):
+    """ Отправка уведомлений через org.freedesktop.Notifications (D-Bus) """
+    SERVICE = "org.freedesktop.Notifications"
+    PATH = "/org/freedesktop/Notifications"
+    INTERFACE = "org.freedesktop.Notifications"
+
+    def __init__(self, bus=None, interface=None):
+        super().__init__()
+        from PyQt6.QtDBus import QDBusConnection, QDBusInterface
+        self.bus = bus if bus is not None else QDBusConnection.sessionBus()
+        self.interface = interface if interface is not None else QDBusInterface(
+            self.SERVICE, self.PATH, self.INTERFACE, self.bus)
+        self.notification_id = 0
+        self.current = None
+        self.callbacks = {}
+        self.actions = []
+        self.persistent = False
+        self.timeout_ms = -1
+        self.pending_close = None
+        # Все вызовы асинхронные; пока ответа на Notify нет, id неизвестен, и следующий
+        # Notify/CloseNotification откладывается до ответа, иначе появилось бы второе уведомление
+        self.notify_in_flight = False
+        self.notify_queued = False
+        self.close_queued = False
+        self.last_notify = 0.0
+        self.bus.connect("", self.PATH, self.INTERFACE, "ActionInvoked", self._on_action_invoked)
+        self.bus.connect("", self.PATH, self.INTERFACE, "NotificationClosed", self._on_notification_closed)
+
+    def is_available(self):
+        return self.bus.isConnected() and self.interface.isValid()
+
+    def show(self, mode_key, title_text, timer_text, buttons_config=None, is_persistent=False, timeout_ms=7000):
+        buttons_key = tuple(btn["id"] for btn in buttons_config or [])
+        superseded, self.current = self.current, DBusNotification(self, mode_key, title_text, timer_text, buttons_key)
+        if superseded is not None:
+            # Старое уведомление не закрываем — новое встанет на его место
+            superseded.alive = False
+        self.pending_close = None
+        self.callbacks = {btn["id"]: btn["command"] for btn in (buttons_config or [])}
+        self.actions = []
+        for btn in buttons_config or []:
+            self.actions += [btn["id"], btn["text"]]
+        self.persistent = is_persistent
+        self.timeout_ms = 0 if is_persistent else timeout_ms
+        self._notify(self.current)
+        return self.current
+
+    def update(self, notification):
+        if notification is self.current:
+            self._notify(notification)
+
+    def update_timer(self, notification):
+        """
+        Тиканье таймера. Серверы уведомлений при замене перезапускают срок жизни (а иные
+        и показывают баннер заново), поэтому временные уведомления не трогаем вовсе,
+        а постоянные обновляем не чаще раза в DBUS_TIMER_UPDATE_SECONDS.
+        """
+        if notification is not self.current or not self.persistent:
+            return
+        if time.monotonic() - self.last_notify >= DBUS_TIMER_UPDATE_SECONDS:
+            self._notify(notification)
+
+    def schedule_close(self, notification):
+        self.pending_close = notification
+        QTimer.singleShot(0, self._flush_close)
+
+    def close_now(self, notification):
+        if notification is self.current:
+            if self.notify_in_flight:
+                self.close_queued = True
+                self.notify_queued = False
+            elif self.notification_id:
+                self._call_async("CloseNotification", self._uint(self.notification_id))
+        notification._mark_closed()
+
+    def _flush_close(self):
+        notification, self.pending_close = self.pending_close, None
+        if notification is not None and notification is self.current:
+            self.close_now(notification)
+
+    def _notify(self, notification):
+        self.close_queued = False
+        if self.notify_in_flight:
+            self.notify_queued = True  # Отправим актуальное содержимое, когда придёт id
+            return
+        from PyQt6.QtDBus import QDBusArgument
+        self.notify_in_flight = True
+        self.last_notify = time.monotonic()
+        self._call_async(
+            "Notify", "ProcrastiNOT", self._uint(self.notification_id), ASSETS.file_path(APP_ICON_PNG),
+            notification.title_text, notification.timer_text,
+            QDBusArgument(self.actions, QMetaType.Type.QStringList.value),
+            {"resident": self.persistent}, self.timeout_ms,
+            on_reply=self._on_notify_reply
+        )
+
+    def _on_notify_reply(self, value, error):
+        self.notify_in_flight = False
+        if error is None:
+            self.notification_id = int(value)
+        else:
+            print(f"Не удалось показать системное уведомление: {error}")
+        if self.close_queued:
+            self.close_queued = False
+            if self.notification_id:
+                self._call_async("CloseNotification", self._uint(self.notification_id))
+        elif self.notify_queued:
+            self.notify_queued = False
+            if self.current is not None and self.current.alive:
+                self._notify(self.current)
+
+    def _call_async(self, method, *args, on_reply=None):
+        """ Вызов без ожидания ответа в GUI-потоке; on_reply(value, error) — по приходу ответа """
+        from PyQt6.QtDBus import QDBusPendingCallWatcher
+        pending = self.interface.asyncCall(method, *args)
+        if on_reply is None:
+            return
+        watcher = QDBusPendingCallWatcher(pending, self)
+        watcher.finished.connect(lambda w: self._finish_call(w, on_reply))
+
+    def _finish_call(self, watcher, on_reply):
+        from PyQt6.QtDBus import QDBusPendingReply
+        reply = QDBusPendingReply(watcher)
+        watcher.deleteLater()
+        if reply.isError():
+            on_reply(None, reply.error().message())
+        else:
+            on_reply(reply.argumentAt(0), None)
+
+    def _uint(self, value):
+        from PyQt6.QtDBus import QDBusArgument
+        return QDBusArgument(value, QMetaType.Type.UInt.value)
+
+    @dbus_slot
+    def _on_action_invoked(self, message):
+        notification_id, action_key = message.arguments()
+        if notification_id == self.notification_id and action_key in self.callbacks:
+            self.callbacks[action_key]()
+
+    @dbus_slot
+    def _on_notification_closed(self, message):
+        notification_id = message.arguments()[0]
+        if notification_id == self.notification_id and self.current is not None:
+            self.current._mark_closed()
+
+
+class NotificationQueue(QObject):
+    """
+    Единственная точка показа уведомлений. Запросы, пришедшие в пределах
+    NOTIFICATION_COALESCE_MS, сливаются: показывается только последний. Если окно
+    того же режима с теми же кнопками уже на экране, оно обновляется на месте;
+    новые окна создаются не чаще раза в NOTIFICATION_MIN_RECREATE_MS.
+    """
+    def __init__(self, factory):
+        super().__init__()
+        self.factory = factory
+        self.active = None
+        self.pending = None          # None, "dismiss" или параметры для factory
+        self.last_created = 0.0
+        self.stats = {"requested": 0, "shown": 0, "updated_in_place": 0, "coalesced": 0, "deferred": 0}
+        self.flush_timer = QTimer(self)
+        self.flush_timer.setSingleShot(True)
+        self.flush_timer.timeout.connect(self.flush)
+
+    @property
+    def dismiss_pending(self):
+        return self.pending == "dismiss"
+
+    @property
+    def request_pending(self):
+        """ Ждёт показа новое содержимое: текущее окно скоро будет заменено или обновлено """
+        return isinstance(self.pending, tuple)
+
+    def request(self, mode_key, title, timer_text, buttons, persistent, timeout_ms):
+        self.stats["requested"] += 1
+        self._enqueue((mode_key, title, timer_text, buttons, persistent, timeout_ms))
+
+    def dismiss(self):
+        if self.active or self.pending:
+            self._enqueue("dismiss")
+
+    def close_now(self):
+        self.flush_timer.stop()
+        self.pending = None
+        if self.active: self.active.close()
+
+    def _enqueue(self, item):
+        if self.pending not in (None, "dismiss"):
+            self.stats["coalesced"] += 1  # Предыдущий запрос так и не был показан
+        self.pending = item
+        if not self.flush_timer.isActive():
+            self.flush_timer.start(NOTIFICATION_COALESCE_MS)
+
+    def flush(self):
+        item = self.pending
+        if item is None:
+            return
+        if item == "dismiss":
+            self.pending = None
+            if self.active and not self.active.closing: self.active.fade_out()
+            return
+        mode_key, title, timer_text, buttons, persistent, timeout_ms = item
+        active = self.active
+        buttons_key = tuple(btn["id"] for btn in buttons)
+        if active and not active.closing and active.mode_key == mode_key and active.buttons_key == buttons_key:
+            self.pending = None
+            active.set_content(title, timer_text)
+            self.stats["updated_in_place"] += 1
+            return
+        wait_ms = NOTIFICATION_MIN_RECREATE_MS - (time.monotonic() - self.last_created) * 1000
+        if wait_ms > 0:
+            # Слишком частое пересоздание: откладываем, новые запросы за это время сольются
+            self.stats["deferred"] += 1
+            self.flush_timer.start(int(wait_ms) + 1)
+            return
+        self.pending = None
+        if active and not active.closing: active.fade_out()
+        notification = self.factory(mode_key, title, timer_text, buttons, persistent, timeout_ms)
+        notification.closed.connect(lambda: self._on_closed(notification))
+        self.active = notification
+        self.last_created = time.monotonic()
+        self.stats["shown"] += 1
+
+    def _on_closed(self, notification):
+        # Закрытие старого уведомления не должно сбрасывать уже показанное новое
+        if self.active is notification:
+            self.active = None
+
+
+class StyledWindow(QWidget):
+    """ Общая основа окон приложения: тёмная тема и размещение по центру экрана """
     def center(self):
         qr = self.frameGeometry()
         cp = self.screen().availableGeometry().center()
@@ -405,7 +942,7 @@ class SettingsWindow(QWidget):
                 padding: 2px;
             }
             
-            QSpinBox, QLineEdit {
+            QSpinBox, QLineEdit, QComboBox {
                 background-color: #3a3a3a;
                 border: 2px solid #555;
                 border-radius: 8px;
@@ -415,12 +952,12 @@ class SettingsWindow(QWidget):
                 min-height: 20px;
             }
             
-            QSpinBox:focus, QLineEdit:focus {
+            QSpinBox:focus, QLineEdit:focus, QComboBox:focus {
                 border-color: #f3a500;
                 background-color: #404040;
             }
             
-            QSpinBox:hover, QLineEdit:hover {
+            QSpinBox:hover, QLineEdit:hover, QComboBox:hover {
                 border-color: #666;
                 background-color: #353535;
             }
@@ -465,6 +1002,29 @@ class SettingsWindow(QWidget):
                 border-color: #f3a500;
             }
             
+            QTabWidget::pane {
+                border: none;
+            }
+            
+            QTabBar::tab {
+                background-color: #2a2a2a;
+                color: #d0d0d0;
+                padding: 8px 12px;
+                border-top-left-radius: 8px;
+                border-top-right-radius: 8px;
+                margin-right: 2px;
+            }
+            
+            QTabBar::tab:selected {
+                background-color: #f3a500;
+                color: #1e1e1e;
+                font-weight: bold;
+            }
+            
+            QTabBar::tab:hover:!selected {
+                background-color: #353535;
+            }
+            
             QPushButton {
                 border-radius: 8px;
                 padding: 10px 20px;
@@ -515,11 +1075,32 @@ class SettingsWindow(QWidget):
                 background-color: #333;
             }
         """
-    
+
+
+class SettingsWindow(StyledWindow):
+    """ Красивое окно настроек на PyQt6 """
+    def __init__(self, parent_app):
+        super().__init__()
+        self.parent_app = parent_app
+        self.config_manager = parent_app.config_manager
+        
+        self.setWindowTitle("Настройки")
+        self.setWindowIcon(ASSETS.icon(APP_ICON_PNG))
+        self.setGeometry(0, 0, 450, 520)
+        self.center()
+        self.setStyleSheet(self.get_stylesheet())
+
+        self.setup_ui()
+        self.load_settings()
+
     def setup_ui(self):
         main_layout = QVBoxLayout(self)
         main_layout.setSpacing(15)
 
+        # Настроек много, поэтому они разложены по вкладкам: окно помещается и на экран 1366x768
+        tabs = QTabWidget()
+        main_layout.addWidget(tabs)
+
         # Timers Group
         timers_group = QGroupBox("Таймеры")
         timers_layout = QGridLayout(timers_group)
@@ -534,7 +1115,6 @@ class SettingsWindow(QWidget):
         timers_layout.addWidget(self.rest_spin, 1, 1)
         timers_layout.addWidget(QLabel("Отложить (мин):"), 2, 0)
         timers_layout.addWidget(self.postpone_spin, 2, 1)
-        main_layout.addWidget(timers_group)
 
         # Schedule Group
         schedule_group = QGroupBox("Расписание")
@@ -547,21 +1127,26 @@ class SettingsWindow(QWidget):
         schedule_layout.addWidget(self.start_hour_spin, 0, 1)
         schedule_layout.addWidget(QLabel("Конец (час):"), 1, 0)
         schedule_layout.addWidget(self.end_hour_spin, 1, 1)
-        main_layout.addWidget(schedule_group)
+        self._add_tab(tabs, "Таймер", timers_group, schedule_group)
 
-        # Other Group
-        other_group = QGroupBox("Прочее")
-        other_layout = QGridLayout(other_group)
+        # Notifications Group
+        notif_group = QGroupBox("Уведомления")
+        notif_layout = QGridLayout(notif_group)
         self.icon_rate_spin = QSpinBox()
         self.icon_rate_spin.setRange(1, 10)
         self.notif_timeout_spin = QSpinBox()
         self.notif_timeout_spin.setRange(1, 30)
-        other_layout.addWidget(QLabel("Иконка (сек):"), 0, 0)
-        other_layout.addWidget(self.icon_rate_spin, 0, 1)
-        other_layout.addWidget(QLabel("Автозакрытие (сек):"), 1, 0)
-        other_layout.addWidget(self.notif_timeout_spin, 1, 1)
+        notif_layout.addWidget(QLabel("Иконка (сек):"), 0, 0)
+        notif_layout.addWidget(self.icon_rate_spin, 0, 1)
+        notif_layout.addWidget(QLabel("Автозакрытие (сек):"), 1, 0)
+        notif_layout.addWidget(self.notif_timeout_spin, 1, 1)
+        self.notif_backend_combo = QComboBox()
+        for key, label in NOTIFICATION_BACKENDS.items():
+            self.notif_backend_combo.addItem(label, key)
+        notif_layout.addWidget(QLabel("Уведомления:"), 2, 0)
+        notif_layout.addWidget(self.notif_backend_combo, 2, 1)
         self.sound_check = QCheckBox("Звук уведомлений")
-        other_layout.addWidget(self.sound_check, 2, 0, 1, 2)
+        notif_layout.addWidget(self.sound_check, 3, 0, 1, 2)
         sound_file_layout = QHBoxLayout()
         self.sound_file_edit = QLineEdit()
         browse_button = QPushButton("...")
@@ -569,9 +1154,49 @@ class SettingsWindow(QWidget):
         browse_button.clicked.connect(self.browse_sound_file)
         sound_file_layout.addWidget(self.sound_file_edit)
         sound_file_layout.addWidget(browse_button)
-        other_layout.addWidget(QLabel("Файл звука:"), 3, 0)
-        other_layout.addLayout(sound_file_layout, 3, 1)
-        main_layout.addWidget(other_group)
+        notif_layout.addWidget(QLabel("Файл звука:"), 4, 0)
+        notif_layout.addLayout(sound_file_layout, 4, 1)
+        self._add_tab(tabs, "Уведомления", notif_group)
+
+        # System Group
+        system_group = QGroupBox("Система")
+        system_layout = QGridLayout(system_group)
+        self.suspend_policy_combo = QComboBox()
+        for key, label in SUSPEND_POLICIES.items():
+            self.suspend_policy_combo.addItem(label, key)
+        self.long_suspend_spin = QSpinBox()
+        self.long_suspend_spin.setRange(1, 240)
+        system_layout.addWidget(QLabel("Долгий сон ПК:"), 0, 0)
+        system_layout.addWidget(self.suspend_policy_combo, 0, 1)
+        system_layout.addWidget(QLabel("Долгий сон от (мин):"), 1, 0)
+        system_layout.addWidget(self.long_suspend_spin, 1, 1)
+        self.autostart_check = QCheckBox("Запускать при входе в систему")
+        system_layout.addWidget(self.autostart_check, 2, 0, 1, 2)
+        self.startup_delay_spin = QSpinBox()
+        self.startup_delay_spin.setRange(0, 600)
+        system_layout.addWidget(QLabel("Задержка запуска (сек):"), 3, 0)
+        system_layout.addWidget(self.startup_delay_spin, 3, 1)
+        self.dashboard_check = QCheckBox("Веб-панель на localhost")
+        system_layout.addWidget(self.dashboard_check, 4, 0, 1, 2)
+        self.dashboard_port_spin = QSpinBox()
+        self.dashboard_port_spin.setRange(1024, 65535)
+        system_layout.addWidget(QLabel("Порт панели:"), 5, 0)
+        system_layout.addWidget(self.dashboard_port_spin, 5, 1)
+        self._add_tab(tabs, "Система", system_group)
+
+        # Sync Group
+        sync_group = QGroupBox("Синхронизация")
+        sync_layout = QGridLayout(sync_group)
+        self.sync_check = QCheckBox("Синхронизировать с другими устройствами")
+        sync_layout.addWidget(self.sync_check, 0, 0, 1, 2)
+        self.sync_host_edit = QLineEdit()
+        self.sync_port_spin = QSpinBox()
+        self.sync_port_spin.setRange(1, 65535)
+        sync_layout.addWidget(QLabel("Сервер:"), 1, 0)
+        sync_layout.addWidget(self.sync_host_edit, 1, 1)
+        sync_layout.addWidget(QLabel("Порт:"), 2, 0)
+        sync_layout.addWidget(self.sync_port_spin, 2, 1)
+        self._add_tab(tabs, "Синхронизация", sync_group)
 
         main_layout.addStretch()
 
@@ -587,6 +1212,15 @@ class SettingsWindow(QWidget):
         button_layout.addWidget(cancel_button)
         button_layout.addWidget(save_button)
         main_layout.addLayout(button_layout)
+
+    def _add_tab(self, tabs, title, *groups):
+        page = QWidget()
+        layout = QVBoxLayout(page)
+        layout.setSpacing(15)
+        for group in groups:
+            layout.addWidget(group)
+        layout.addStretch()
+        tabs.addTab(page, title)
         
     def load_settings(self):
         self.work_spin.setValue(self.config_manager.work_minutes)
@@ -598,6 +1232,16 @@ class SettingsWindow(QWidget):
         self.notif_timeout_spin.setValue(self.config_manager.notif_timeout)
         self.sound_check.setChecked(self.config_manager.sound_enabled)
         self.sound_file_edit.setText(self.config_manager.sound_file)
+        self.notif_backend_combo.setCurrentIndex(self.notif_backend_combo.findData(self.config_manager.notif_backend))
+        self.dashboard_check.setChecked(self.config_manager.dashboard_enabled)
+        self.dashboard_port_spin.setValue(self.config_manager.dashboard_port)
+        self.suspend_policy_combo.setCurrentIndex(self.suspend_policy_combo.findData(self.config_manager.suspend_policy))
+        self.long_suspend_spin.setValue(self.config_manager.long_suspend_minutes)
+        self.sync_check.setChecked(self.config_manager.sync_enabled)
+        self.sync_host_edit.setText(self.config_manager.sync_host)
+        self.sync_port_spin.setValue(self.config_manager.sync_port)
+        self.autostart_check.setChecked(self.config_manager.autostart_enabled)
+        self.startup_delay_spin.setValue(self.config_manager.startup_delay)
 
     def save_settings(self):
         try:
@@ -610,16 +1254,27 @@ class SettingsWindow(QWidget):
             self.config_manager.notif_timeout = self.notif_timeout_spin.value()
             self.config_manager.sound_enabled = self.sound_check.isChecked()
             self.config_manager.sound_file = self.sound_file_edit.text()
+            self.config_manager.notif_backend = self.notif_backend_combo.currentData()
+            self.config_manager.dashboard_enabled = self.dashboard_check.isChecked()
+            self.config_manager.dashboard_port = self.dashboard_port_spin.value()
+            self.config_manager.suspend_policy = self.suspend_policy_combo.currentData()
+            self.config_manager.long_suspend_minutes = self.long_suspend_spin.value()
+            self.config_manager.sync_enabled = self.sync_check.isChecked()
+            self.config_manager.sync_host = self.sync_host_edit.text().strip() or '127.0.0.1'
+            self.config_manager.sync_port = self.sync_port_spin.value()
+            autostart_was_enabled = self.config_manager.autostart_enabled
+            self.config_manager.autostart_enabled = self.autostart_check.isChecked()
+            self.config_manager.startup_delay = self.startup_delay_spin.value()
             
             self.config_manager.save_config()
+            self.parent_app.apply_autostart(remove=autostart_was_enabled)
             self.parent_app.load_settings()
 
             QMessageBox.information(self, "Сохранено", "Настройки сохранены и применены.")
             self.close()
             
             timer_was_running = self.parent_app.main_timer.isActive()
-            if self.parent_app.active_notification:
-                self.parent_app.active_notification.fade_out()
+            self.parent_app.notifications.dismiss()
             if timer_was_running:
                 self.parent_app.start_main_timer()
 
@@ -632,56 +1287,556 @@ class SettingsWindow(QWidget):
             self.sound_file_edit.setText(filename)
 
 
+class StatsWindow(StyledWindow):
+    """ Окно статистики: итоги по дням, неделям и месяцам и тренды за последние дни """
+    COLUMNS = ("Период", "Работа", "Отдых", "Переработка", "Отсрочек")
+
+    def __init__(self, parent_app):
+        super().__init__()
+        self.parent_app = parent_app
+        self.daily = None
+
+        self.setWindowTitle("Статистика")
+        self.setWindowIcon(ASSETS.icon(APP_ICON_PNG))
+        self.setGeometry(0, 0, 560, 640)
+        self.center()
+        self.setStyleSheet(self.get_stylesheet())
+
+        self.setup_ui()
+        self.refresh()
+
+    def get_stylesheet(self):
+        return super().get_stylesheet() + """
+            QTableWidget {
+                background-color: #2a2a2a;
+                gridline-color: #444;
+                border: none;
+            }
+            QHeaderView::section {
+                background-color: #3a3a3a;
+                color: #e0e0e0;
+                border: none;
+                padding: 6px;
+                font-weight: bold;
+            }
+        """
+
+    def setup_ui(self):
+        main_layout = QVBoxLayout(self)
+        main_layout.setSpacing(20)
+        main_layout.setContentsMargins(25, 25, 25, 25)
+
+        trend_group = QGroupBox(f"Последние {STATS_TREND_DAYS} дней")
+        trend_layout = QGridLayout(trend_group)
+        self.avg_overtime_label = QLabel("—")
+        self.postpone_rate_label = QLabel("—")
+        trend_layout.addWidget(QLabel("Переработка в день:"), 0, 0)
+        trend_layout.addWidget(self.avg_overtime_label, 0, 1)
+        trend_layout.addWidget(QLabel("Отложено предложений:"), 1, 0)
+        trend_layout.addWidget(self.postpone_rate_label, 1, 1)
+        main_layout.addWidget(trend_group)
+
+        totals_group = QGroupBox("Итоги")
+        totals_layout = QVBoxLayout(totals_group)
+        self.period_combo = QComboBox()
+        for key, label in PERIODS.items():
+            self.period_combo.addItem(label, key)
+        self.period_combo.currentIndexChanged.connect(self.fill_table)
+        totals_layout.addWidget(self.period_combo)
+        self.table = QTableWidget(0, len(self.COLUMNS))
+        self.table.setHorizontalHeaderLabels(self.COLUMNS)
+        self.table.verticalHeader().setVisible(False)
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        self.table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        totals_layout.addWidget(self.table)
+        main_layout.addWidget(totals_group)
+
+        button_layout = QHBoxLayout()
+        button_layout.addStretch()
+        refresh_button = QPushButton("Обновить")
+        refresh_button.setObjectName("CancelButton")
+        refresh_button.clicked.connect(self.refresh)
+        close_button = QPushButton("Закрыть")
+        close_button.setObjectName("SaveButton")
+        close_button.clicked.connect(self.close)
+        button_layout.addWidget(refresh_button)
+        button_layout.addWidget(close_button)
+        main_layout.addLayout(button_layout)
+
+    def refresh(self):
+        """ Перечитывает историю с диска: дневные итоги считаются один раз, остальное — из них """
+        try:
+            # Дни без записей до сегодняшнего включительно — нули, иначе тренд застынет на последнем активном дне
+            self.daily = extend_to(daily_rollup(self.parent_app.history.load()), date.today())
+        except ImportError:
+            self.daily = None
+            self.avg_overtime_label.setText("Для статистики нужен NumPy")
+            return
+        except (OSError, ValueError) as e:
+            self.daily = None
+            print(f"Не удалось прочитать статистику: {e}")
+            return
+        if len(self.daily["period"]):
+            trend = trends(self.daily, STATS_TREND_DAYS)
+            self.avg_overtime_label.setText(self.parent_app.format_duration(trend["avg_overtime"][-1]))
+            self.postpone_rate_label.setText(f"{trend['postpone_rate'][-1] * 100:.0f}%")
+        self.fill_table()
+
+    def fill_table(self):
+        if self.daily is None:
+            return
+        period = self.period_combo.currentData()
+        rows = regroup(self.daily, period)
+        fmt = self.parent_app.format_duration
+        count = len(rows["period"])
+        self.table.setRowCount(count)
+        for row in range(count):
+            i = count - 1 - row  # Новые периоды сверху
+            label = str(rows["period"][i])
+            if period == "month":
+                label = label[:7]
+            elif period == "week":
+                label = "с " + label
+            values = (label, fmt(rows["work"][i]), fmt(rows["rest"][i]),
+                      fmt(rows["overtime"][i]), str(int(rows["postpones"][i])))
+            for column, value in enumerate(values):
+                self.table.setItem(row, column, QTableWidgetItem(value))
+
+
+class SyncBridge(QObject):
+    """ Переносит изменения от SyncClient (фоновый поток) в GUI-поток """
+    remote_state = pyqtSignal(dict)
+
+
+class ControlBridge(QObject):
+    """ Переносит команды из ControlServer (фоновый поток) в GUI-поток """
+    command = pyqtSignal(object)
+
+
 class ProductivityApp:
-    def __init__(self, app_instance):
+    def __init__(self, app_instance, autostart=False):
         self.app = app_instance
+        self.autostart = autostart
+        self.started = False
+        self.startup_log = StartupLog(STARTUP_T0, autostart)
+        self.startup_log.mark("qt")
         self.config_manager = ConfigManager(CONFIG_FILE)
+        # Все дедлайны считаются по монотонным часам, см. ClockService
+        self.clock = ClockService()
         
+        self.sync_client = None
+        self.dbus_backend = None
+        self.sync_bridge = SyncBridge()
+        self.sync_bridge.remote_state.connect(self._apply_remote_state)
+        self.control_server = None
+        self.dashboard = None
+        self.control_bridge = ControlBridge()
+        self.control_bridge.command.connect(self._run_control_command)
+
+        self.icon_renderer = TrayIconRenderer(self.app)
         self.sound_effect = QSoundEffect()
-        self.load_settings()
+        self.work_duration_sec = self.rest_duration_sec = self.postpone_duration_sec = 0
 
         self.current_mode = "work"
         self.last_icon_update_time = 0
         self.current_phase_end_time = 0
         self.overtime_start_time = 0
-
-        self.active_notification = None
+        self.postponed_from_work = False
+        self.phase_start_time = self.clock.now()
+        self.today_totals = new_totals(local_day(self.phase_start_time))
+        self.tasks = TaskLedger.load()
+        self.history = StatsStore()
+        # Снимок читаем до создания виджетов, чтобы сразу стартовать с нужной фазы
+        restored = self._restore_state()
+        self._phase_mode = (self.current_mode, self.postponed_from_work)
+        self.task_segment_start = self.phase_start_time
+
+        self.notifications = NotificationQueue(self._create_notification)
         self.settings_window = None
+        self.stats_window = None
 
 
         
+        self.task_flush_timer = QTimer()
+        self.task_flush_timer.setInterval(TASK_FLUSH_INTERVAL_MS)
+        self.task_flush_timer.timeout.connect(self._flush_tasks)
+        self.task_flush_timer.start()
+
+        self.state_alive_timer = QTimer()
+        self.state_alive_timer.setInterval(STATE_ALIVE_INTERVAL_MS)
+        self.state_alive_timer.timeout.connect(self._touch_state)
+        self.state_alive_timer.start()
+
+        # Однократный таймер: каждый тик планирует следующий к смене секунды на экране
         self.main_timer = QTimer()
-        self.main_timer.setInterval(1000)
+        self.main_timer.setSingleShot(True)
+        self.main_timer.setTimerType(Qt.TimerType.PreciseTimer)
         self.main_timer.timeout.connect(self.update_timer_tick)
         
+        # Сначала только иконка в трее, остальное — этапами (см. _run_startup)
         self.setup_tray_icon()
-        self.start_main_timer()
+        self.startup_log.mark("tray")
+        self._restored = restored
+        self._run_startup()
+
+    def _run_startup(self):
+        """
+        Этапы запуска. При обычном запуске выполняются сразу, при автозапуске —
+        после startup_delay и с паузами, чтобы не толкаться с другими программами
+        при входе в систему.
+        """
+        stages = [
+            ("config", self._apply_config),
+            ("sound", self._load_sound),
+            ("first_notification", self._start_first_phase),
+            ("services", self._start_services),
+        ]
+        if not self.autostart:
+            for name, stage in stages:
+                stage()
+                self.startup_log.mark(name)
+            self.startup_log.write()
+            return
+        self.tray_icon.setToolTip("Таймер продуктивности (запускается...)")
+        delay_ms = self.config_manager.startup_delay * 1000
+        for i, (name, stage) in enumerate(stages):
+            QTimer.singleShot(delay_ms + i * STARTUP_STAGE_GAP_MS, lambda name=name, stage=stage: self._run_stage(name, stage))
+
+    def _run_stage(self, name, stage):
+        stage()
+        self.startup_log.mark(name)
+        if name == "services":
+            self.startup_log.write()
+
+    def _start_first_phase(self):
+        self.started = True
+        # Задержка запуска и паузы между этапами — не сон системы: первая проверка часов
+        # иначе сдвинула бы восстановленную фазу или устроила вынужденный отдых
+        self.clock.reset()
+        ASSETS.preload(self.app.primaryScreen().devicePixelRatio())
+        self.start_main_timer(keep_phase_end=self._restored)
+
+    def _start_services(self):
+        self._restart_sync()
+        self._restart_dashboard()
+        self._start_control_server()
+        self.apply_autostart()  # Обновляет путь в записи, если программу перенесли
+
+    def apply_autostart(self, remove=False):
+        """
+        Включённый автозапуск — обновляет запись в системе. Удаляет её только при remove=True,
+        то есть когда пользователь сам снял галочку: запись, созданную вручную, не трогаем.
+        """
+        cm = self.config_manager
+        if not cm.autostart_enabled and not (remove and is_autostart_enabled()):
+            return
+        try:
+            set_autostart_enabled(cm.autostart_enabled, __file__, ASSETS.file_path(APP_ICON_PNG))
+        except OSError as e:
+            print(f"Не удалось настроить автозапуск: {e}")
 
     def load_settings(self):
+        self._apply_config()
+        self._load_sound()
+        self._restart_sync()
+        self._restart_dashboard()
+
+    def _apply_config(self):
         self.config_manager.load_config()
         self.work_duration_sec = self.config_manager.work_minutes * 60
         self.rest_duration_sec = self.config_manager.rest_minutes * 60
         self.postpone_duration_sec = self.config_manager.postpone_minutes * 60
-        if os.path.exists(self.config_manager.sound_file):
-            self.sound_effect.setSource(QUrl.fromLocalFile(self.config_manager.sound_file))
+        if self.config_manager.sound_enabled and ASSETS.sound_url(self.config_manager.sound_file) is None:
+            print(f"Не удалось найти файл звука: {self.config_manager.sound_file}")
+
+    def _load_sound(self):
+        sound_url = ASSETS.sound_url(self.config_manager.sound_file)
+        if sound_url is not None and sound_url != self.sound_effect.source():
+            self.sound_effect.setSource(sound_url)
+
+    def _restart_dashboard(self):
+        cm = self.config_manager
+        wanted = cm.dashboard_port if cm.dashboard_enabled else None
+        if self.dashboard and self.dashboard.port == wanted:
+            return
+        if self.dashboard:
+            self.dashboard.stop()
+            self.dashboard = None
+        if wanted:
+            dashboard = DashboardServer(port=wanted)
+            try:
+                dashboard.start()
+            except OSError as e:
+                print(f"Не удалось запустить веб-панель: {e}")
+                return
+            self.dashboard = dashboard
+            if hasattr(self, 'tray_icon'):
+                self.dashboard.publish(self._status_payload())
+
+    def open_dashboard(self):
+        if self.dashboard:
+            QDesktopServices.openUrl(QUrl(f"http://127.0.0.1:{self.dashboard.port}/"))
+
+    def _notification_backend(self):
+        """ Системный бэкенд, если он выбран и доступен, иначе None (встроенные окна) """
+        if self.config_manager.notif_backend != "freedesktop":
+            return None
+        if self.dbus_backend is None:
+            try:
+                backend = FreedesktopNotificationBackend()
+            except ImportError as e:
+                print(f"QtDBus недоступен: {e}")
+                self.config_manager.notif_backend = "custom"
+                return None
+            if not backend.is_available():
+                print("Сервер уведомлений D-Bus не найден, используются встроенные уведомления")
+                self.config_manager.notif_backend = "custom"
+                return None
+            self.dbus_backend = backend
+        return self.dbus_backend
+
+    def _restart_sync(self):
+        cm = self.config_manager
+        wanted = (cm.sync_node_id, cm.sync_host, cm.sync_port) if cm.sync_enabled else None
+        current = self.sync_client
+        if current and wanted == (current.node_id, current.host, current.port):
+            return
+        if current:
+            current.stop()
+            self.sync_client = None
+        if wanted:
+            self.sync_client = SyncClient(*wanted, on_remote_change=self.sync_bridge.remote_state.emit)
+            self.sync_client.start()
+            if hasattr(self, 'tray_icon'):
+                self._on_transition()
+
+    def _timer_state(self):
+        return {
+            "mode": self.current_mode,
+            "phase_end": self.current_phase_end_time,
+            "overtime_start": self.overtime_start_time,
+            "postponed_from_work": bool(self.postponed_from_work),
+            "phase_start": self.phase_start_time,
+            "totals": self.today_totals,
+            "last_alive": self.clock.now(),
+        }
 
-    def _generate_icon_image(self, text, bg_color, fg_color):
-        pixmap = QPixmap(64, 64)
-        pixmap.fill(Qt.GlobalColor.transparent)
-        
-        painter = QPainter(pixmap)
-        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+    def _restore_state(self):
+        """ Восстанавливает фазу из снимка. Возвращает True, если было что восстановить """
+        state = load_state(STATE_FILE)
+        if not state or state["mode"] == "idle_inactive_hours":
+            return False
+        mode = state["mode"]
+        if state["totals"]["day"] == self.today_totals["day"]:
+            self.today_totals = state["totals"]
+        # Последняя известная отметка работы приложения: обновляется раз в минуту и при выходе,
+        # поэтому после сбоя или перезагрузки время, уже прошедшее в фазе, простоем не считается
+        last_seen = state["last_alive"] or state["phase_start"] or self.clock.now()
+        if self._is_long_downtime(last_seen, self.clock.now()):
+            # Приложение было закрыто долго (или на ночь): время простоя никуда не засчитываем,
+            # устаревшее предложение с часами переработки не показываем, начинаем новую фазу
+            return False
+        self.current_phase_end_time = state["phase_end"]
+        self.overtime_start_time = state["overtime_start"]
+        self.postponed_from_work = state["postponed_from_work"]
+        # Отрезок после последней смены фазы ещё не засчитан — продолжаем его с того же начала
+        self.phase_start_time = state["phase_start"] or last_seen
+        if mode in ["work", "rest", "postponed"] and self.current_phase_end_time <= self.clock.now():
+            # Фаза закончилась, пока приложение было закрыто: переработка идёт с момента окончания
+            self.today_totals = account_phase(self.today_totals, mode, self.postponed_from_work,
+                                              self.phase_start_time, self.current_phase_end_time)
+            self.tasks.account(mode, self.postponed_from_work, self.phase_start_time, self.current_phase_end_time)
+            self._record_history(mode, self.postponed_from_work, self.phase_start_time, self.current_phase_end_time)
+            mode = "work_prompt" if mode == "rest" else "rest_prompt"
+            self.overtime_start_time = self.phase_start_time = self.current_phase_end_time
+        self.current_mode = mode
+        return True
+
+    def _is_long_downtime(self, start, end):
+        """ Перерыв длиннее long_suspend_minutes или захватывающий конец активных часов """
+        if end - start > self.config_manager.long_suspend_minutes * 60:
+            return True
+        start_dt, end_dt = datetime.fromtimestamp(start), datetime.fromtimestamp(end)
+        if (end_dt.date() - start_dt.date()).days > 1:
+            return True
+        end_hour = dt_time(self.config_manager.active_end_hour, 0)
+        for day in {start_dt.date(), end_dt.date()}:
+            if start_dt < datetime.combine(day, end_hour) <= end_dt:
+                return True
+        return False
+
+    def _flush_tasks(self):
+        if self.tasks.dirty:
+            try:
+                self.tasks.save()
+            except OSError as e:
+                print(f"Не удалось сохранить учёт задач: {e}")
+
+    def set_current_task(self, task_id):
+        """ Переключает задачу посреди фазы: уже прошедшее время остаётся за прежней """
+        now = self.clock.now()
+        mode, postponed = self._phase_mode
+        self.tasks.account(mode, postponed, self.task_segment_start, now)
+        self.task_segment_start = now
+        self.tasks.select(task_id)
+        self._flush_tasks()
+        self.update_display_elements()
 
-        path = QPainterPath()
-        path.addRoundedRect(0, 0, 64, 64, 12, 12)
-        painter.fillPath(path, QBrush(QColor(bg_color)))
+    def ask_new_task(self):
+        name, ok = QInputDialog.getText(None, "Новая задача", "Задача или проект:")
+        if ok and name.strip():
+            self.set_current_task(self.tasks.intern(name))
+
+    def _populate_task_menu(self, menu):
+        menu.clear()
+        menu.addAction("Новая задача…").triggered.connect(self.ask_new_task)
+        none_action = menu.addAction("Без задачи")
+        none_action.setCheckable(True)
+        none_action.setChecked(self.tasks.current == NO_TASK)
+        none_action.triggered.connect(lambda: self.set_current_task(NO_TASK))
+        if self.tasks.recent:
+            menu.addSeparator()
+        for task_id in self.tasks.recent:
+            action = menu.addAction(self.tasks.names[task_id])
+            action.setCheckable(True)
+            action.setChecked(task_id == self.tasks.current)
+            action.triggered.connect(lambda checked, t=task_id: self.set_current_task(t))
+
+    def _populate_task_stats_menu(self, menu):
+        menu.clear()
+        # Счётчики обновляются при смене фазы, поэтому здесь не пересчитываем историю
+        top = self.tasks.top(TASK_MENU_SIZE)
+        if not top:
+            menu.addAction("Пока пусто").setEnabled(False)
+        for name, work, overtime, postpones in top:
+            text = f"{name} — {self.format_duration(work)}"
+            if overtime: text += f" (+{self.format_duration(overtime)})"
+            if postpones: text += f", отсрочек: {postpones}"
+            menu.addAction(text).setEnabled(False)
+
+    def _account_transition(self, now=None):
+        """ Закрывает предыдущую фазу в итогах дня и начинает отсчёт новой (с момента now) """
+        if now is None: now = self.clock.now()
+        prev_mode, prev_postponed = self._phase_mode
+        self._account_segment(now)
+        if self.current_mode == "postponed" and prev_mode != "postponed":
+            self.today_totals["postpones"] += 1
+            if not self.postponed_from_work:
+                self.tasks.add_postpone()
+        self._phase_mode = (self.current_mode, self.postponed_from_work)
+        if self.tasks.dirty >= TASK_FLUSH_BATCH:
+            self._flush_tasks()
+
+    def _account_segment(self, now):
+        """ Засчитывает отрезок текущей фазы до now в итоги дня, задачи и историю; следующий начинается с now """
+        mode, postponed = self._phase_mode
+        self.today_totals = account_phase(self.today_totals, mode, postponed, self.phase_start_time, now)
+        self.tasks.account(mode, postponed, self.task_segment_start, now)
+        self._record_history(mode, postponed, self.phase_start_time, now)
+        self.phase_start_time = self.task_segment_start = now
+
+    def _touch_state(self):
+        if self.current_mode == "idle_inactive_hours":
+            return  # Сон вне активных часов не восстанавливается, отметка не нужна
+        try:
+            touch_state(STATE_FILE, self.clock.now())
+        except OSError as e:
+            print(f"Не удалось обновить состояние: {e}")
 
-        font = QFont(APP_FONT_FAMILY, 28, QFont.Weight.Bold)
-        painter.setFont(font)
-        painter.setPen(QPen(QColor(fg_color)))
-        painter.drawText(pixmap.rect(), Qt.AlignmentFlag.AlignCenter, text)
-        painter.end()
-        return QIcon(pixmap)
+    def _save_state(self):
+        try:
+            save_state(STATE_FILE, self._timer_state())
+        except OSError as e:
+            print(f"Не удалось сохранить состояние: {e}")
+
+    def _record_history(self, mode, postponed_from_work, start, end):
+        try:
+            self.history.record(mode, postponed_from_work, start, end)
+        except OSError as e:
+            print(f"Не удалось записать статистику: {e}")
+
+    def _on_transition(self):
+        """ Вызывается после каждой смены фазы (и только тогда) """
+        self._account_transition()
+        self._save_state()
+        # Сон вне активных часов у каждого устройства свой, его не рассылаем
+        if self.sync_client and self.current_mode != "idle_inactive_hours":
+            self.sync_client.publish(self._timer_state())
+        if self.dashboard:
+            # Итоги уже посчитаны инкрементально, панели уходит готовый снимок
+            self.dashboard.publish(self._status_payload())
+
+    def _apply_remote_state(self, values):
+        """ Применяет состояние, пришедшее с другого устройства """
+        if self.current_mode == "idle_inactive_hours" or not self.is_within_active_hours():
+            return
+        if values["mode"] not in MODES:
+            return
+        # Состояние приходит целиком, поля всегда согласованы между собой
+        self.current_mode = values["mode"]
+        self.current_phase_end_time = values["phase_end"]
+        self.overtime_start_time = values["overtime_start"]
+        self.postponed_from_work = bool(values["postponed_from_work"])
+        # Регистр уже совпадает с состоянием SyncClient, поэтому повторно не уйдёт
+        self.start_main_timer(keep_phase_end=True)
+
+    def _start_control_server(self):
+        try:
+            self.control_server = ControlServer(self._handle_control_request)
+            self.control_server.start()
+        except OSError as e:
+            self.control_server = None
+            print(f"Не удалось запустить канал управления: {e}")
+
+    def _handle_control_request(self, request):
+        """ Фоновый поток ControlServer: передаём команду в GUI-поток и ждём результат """
+        if request.get("cmd") not in CONTROL_COMMANDS:
+            return {"ok": False, "error": f"неизвестная команда {request.get('cmd')}"}
+        job = {"cmd": request["cmd"], "done": threading.Event(), "result": None, "error": None}
+        self.control_bridge.command.emit(job)
+        if not job["done"].wait(CONTROL_REPLY_TIMEOUT):
+            return {"ok": False, "error": "приложение не отвечает"}
+        if job["error"]:
+            return {"ok": False, "error": job["error"]}
+        return {"ok": True, "status": job["result"]}
+
+    def _run_control_command(self, job):
+        cmd = job["cmd"]
+        if cmd == "start-work":
+            self.start_work_action()
+        elif cmd == "start-rest":
+            self.start_rest_action()
+        elif cmd == "postpone":
+            # Как и в интерфейсе, отложить можно только предложение сменить фазу
+            if self.current_mode == "rest_prompt":
+                self.postpone_rest_action()
+            elif self.current_mode == "work_prompt":
+                self.postpone_work_action()
+            else:
+                job["error"] = "отложить можно только предложение отдохнуть или вернуться к работе"
+        job["result"] = self._status_payload()
+        job["done"].set()
+
+    def _status_payload(self):
+        """ Состояние для внешних клиентов; итоги дня включают текущую фазу """
+        now = self.clock.now()
+        state = self._timer_state()
+        mode, postponed = self._phase_mode
+        state["totals"] = account_phase(dict(self.today_totals), mode, postponed, self.phase_start_time, now)
+        state["bucket"] = phase_bucket(mode, postponed)
+        state["notifications"] = dict(self.notifications.stats)
+        state["now"] = now
+        return state
+
+    def _generate_icon_image(self, text, bg_color, fg_color):
+        return self.icon_renderer.icon(text, bg_color, fg_color)
+
+    def _set_tray_icon(self, text, bg_color, fg_color):
+        # Тот же текст и цвета — иконку не трогаем, трей не перерисовывается
+        key = (text, bg_color, fg_color)
+        if key != self.icon_renderer.shown_key:
+            self.tray_icon.setIcon(self._generate_icon_image(text, bg_color, fg_color))
+            self.icon_renderer.shown_key = key
     
     def play_sound(self):
         if self.config_manager.sound_enabled and self.sound_effect.isLoaded():
@@ -694,16 +1849,20 @@ class ProductivityApp:
         if e < s: return n >= s or n <= e
         return s <= n <= e
 
-    def start_main_timer(self):
+    def start_main_timer(self, keep_phase_end=False):
         self.main_timer.stop()
+        if self.current_mode == "idle_inactive_hours":
+            # Во сне тиков нет: сверяем часы здесь, чтобы паузу не приняли за сон системы
+            self._handle_clock_events()
 
         if not self.is_within_active_hours():
             if self.current_mode != "idle_inactive_hours":
                 self.current_mode = "idle_inactive_hours"
-                if self.active_notification: self.active_notification.fade_out()
+                self.notifications.dismiss()
                 self.show_notification()
+                self._on_transition()
             self.tray_icon.setToolTip("Спит (вне часов)")
-            self.tray_icon.setIcon(self._generate_icon_image("Zzz", TRAY_ICON_IDLE_BG, TRAY_ICON_IDLE_FG))
+            self._set_tray_icon("Zzz", TRAY_ICON_IDLE_BG, TRAY_ICON_IDLE_FG)
             QTimer.singleShot(60 * 1000, self.start_main_timer) # Проверяем через минуту
             return
 
@@ -720,15 +1879,74 @@ class ProductivityApp:
             "postponed": self.postpone_duration_sec
         }.get(self.current_mode, 0)
 
-        # Всегда начинаем новый отсчет с текущего момента
-        self.current_phase_end_time = time.time() + duration_sec
+        # Начинаем новый отсчет с текущего момента, если фаза не пришла извне уже запущенной
+        if not keep_phase_end:
+            self.current_phase_end_time = self.clock.now() + duration_sec
+
+        # Последние секунды фазы перерисовываются каждую секунду — готовим кадры заранее
+        if self.current_mode in TRAY_ICON_COUNTDOWN_COLORS:
+            self.icon_renderer.prebuild(
+                [str(i) for i in range(TRAY_ICON_COUNTDOWN_SECONDS + 1)], *TRAY_ICON_COUNTDOWN_COLORS[self.current_mode]
+            )
         
         # Показываем уведомление для ТОЛЬКО ЧТО установленного режима
         self.show_notification() 
         self.update_display_elements()
-        self.main_timer.start()
+        self._schedule_next_tick()
+        self._on_transition()
+
+    def _schedule_next_tick(self):
+        if self.current_mode in ["rest_prompt", "work_prompt"]:
+            reference = self.overtime_start_time
+        else:
+            reference = self.current_phase_end_time
+        self.main_timer.start(self.clock.ms_until_next_second(reference))
+
+    def _handle_clock_events(self):
+        """ Реакция на сон системы и скачки системного времени. True, если фаза сменилась """
+        for event in self.clock.check():
+            if event[0] == "wall_jump":
+                # Шкала now() сдвинулась вместе с системным временем; оставшееся время фаз сохраняем
+                delta = event[1]
+                self.current_phase_end_time += delta
+                self.overtime_start_time += delta
+                self.phase_start_time += delta
+                self.task_segment_start += delta
+                self._on_transition()
+            elif event[0] == "suspend" and self._handle_suspend(event[1], event[2]):
+                return True
+        return False
+
+    def _handle_suspend(self, start, duration):
+        if self.current_mode == "idle_inactive_hours":
+            return False
+        policy = self.config_manager.suspend_policy
+        if policy == "pause":
+            # Время сна не засчитывается ни в одну фазу
+            self.current_phase_end_time += duration
+            self.overtime_start_time += duration
+            self.phase_start_time += duration
+            self.task_segment_start += duration
+            self._on_transition()
+            return False
+        if policy != "rest" or duration < self.config_manager.long_suspend_minutes * 60:
+            return False
+        # Долгий сон считаем отдыхом, начавшимся в момент засыпания; устаревшее предложение не показываем
+        rest_end = self.current_phase_end_time if self.current_mode == "rest" else start + self.rest_duration_sec
+        self.current_mode = "rest"
+        self.current_phase_end_time = rest_end
+        self._account_transition(start)
+        self.notifications.dismiss()
+        if rest_end > self.clock.now():
+            self.start_main_timer(keep_phase_end=True)
+        else:
+            self.current_mode = "work"
+            self.start_main_timer()
+        return True
 
     def update_timer_tick(self):
+        if self._handle_clock_events():
+            return
         if not self.is_within_active_hours():
             self.start_main_timer()
             return
@@ -737,22 +1955,25 @@ class ProductivityApp:
             # В режиме переработки просто обновляем дисплей
             self.update_display_elements()
         else:
-            remaining_seconds = max(0, int(self.current_phase_end_time - time.time()))
+            remaining_seconds = max(0, int(self.current_phase_end_time - self.clock.now()))
             self.update_display_elements(current_remaining_seconds=remaining_seconds)
 
             if remaining_seconds <= 0:
                 if self.current_mode in ["work", "postponed"]:
                     self.play_sound()
                     self.current_mode = "rest_prompt"
-                    self.overtime_start_time = time.time()
+                    self.overtime_start_time = self.clock.now()
                     self.update_display_elements()
                     self.show_notification(is_rest_prompt=True)
+                    self._on_transition()
                 elif self.current_mode == "rest":
                     self.play_sound()
                     self.current_mode = "work_prompt"
-                    self.overtime_start_time = time.time()
+                    self.overtime_start_time = self.clock.now()
                     self.update_display_elements()
                     self.show_notification(is_work_prompt=True)
+                    self._on_transition()
+        self._schedule_next_tick()
     
     def update_display_elements(self, current_remaining_seconds=None):
         # --- ИСПРАВЛЕНИЕ RuntimeError ---
@@ -761,13 +1982,13 @@ class ProductivityApp:
     
         if current_remaining_seconds is None:
             if mode in ["rest_prompt", "work_prompt"]:
-                current_remaining_seconds = int(time.time() - self.overtime_start_time)
+                current_remaining_seconds = int(self.clock.now() - self.overtime_start_time)
             else:
-                current_remaining_seconds = max(0, int(self.current_phase_end_time - time.time()))
+                current_remaining_seconds = max(0, int(self.current_phase_end_time - self.clock.now()))
         
-        now = time.time()
+        now = self.clock.now()
         needs_icon_update = (now - self.last_icon_update_time >= self.config_manager.icon_update_rate) or \
-                            (mode not in ["rest_prompt", "idle_inactive_hours"] and current_remaining_seconds <= 5)
+                            (mode not in ["rest_prompt", "idle_inactive_hours"] and current_remaining_seconds <= TRAY_ICON_COUNTDOWN_SECONDS)
         
         m, s = divmod(current_remaining_seconds, 60)
         icon_text = str(m if m > 0 else current_remaining_seconds)
@@ -778,18 +1999,20 @@ class ProductivityApp:
         if mode == "work":
             tray_bg, tray_fg = TRAY_ICON_WORK_BG, TRAY_ICON_WORK_FG
             tray_title = f"Работа: {timer_text}"
+            task_name = self.tasks.current_name()
+            if task_name: tray_title += f" · {task_name}"
         elif mode == "rest":
             tray_bg, tray_fg = TRAY_ICON_REST_BG, TRAY_ICON_REST_FG
             tray_title = f"Отдых: {timer_text}"
         elif mode == "rest_prompt":
-            overtime_seconds = int(time.time() - self.overtime_start_time)
+            overtime_seconds = int(self.clock.now() - self.overtime_start_time)
             m, s = divmod(overtime_seconds, 60)
             icon_text = str(m if m > 0 else overtime_seconds)
             tray_bg, tray_fg = TRAY_ICON_PROMPT_BG, TRAY_ICON_PROMPT_FG
             tray_title = f"Переработка: {self.format_time(overtime_seconds)}"
             timer_text = self.format_time(overtime_seconds)
         elif mode == "work_prompt":
-            overtime_seconds = int(time.time() - self.overtime_start_time)
+            overtime_seconds = int(self.clock.now() - self.overtime_start_time)
             m, s = divmod(overtime_seconds, 60)
             icon_text = str(m if m > 0 else overtime_seconds)
             tray_bg, tray_fg = TRAY_ICON_WORK_PROMPT_BG, TRAY_ICON_WORK_PROMPT_FG
@@ -805,21 +2028,29 @@ class ProductivityApp:
         
         self.tray_icon.setToolTip(tray_title)
         if needs_icon_update and icon_text:
-            self.tray_icon.setIcon(self._generate_icon_image(icon_text, tray_bg, tray_fg))
+            self._set_tray_icon(icon_text, tray_bg, tray_fg)
             self.last_icon_update_time = now
     
-        if self.active_notification:
+        # Пока в очереди новый запрос, старое окно не трогаем: иначе оно на миг покажет
+        # отсчёт новой фазы, а D-Bus получит лишний Notify
+        if self.active_notification and not self.notifications.request_pending:
             self.active_notification.update_timer(timer_text)
     
     def format_time(self, seconds):
         m, s = divmod(seconds, 60)
         return f"{m:02d}:{s:02d}"
+
+    def format_duration(self, seconds):
+        h, m = divmod(int(seconds) // 60, 60)
+        return f"{h}ч {m:02d}м" if h else f"{m}м"
     
 # --- Вставьте этот код в класс ProductivityApp, ЗАМЕНИВ старые версии этих методов ---
 
 # --- Вставьте этот код в класс ProductivityApp, ПОЛНОСТЬЮ ЗАМЕНИВ старые версии этих методов ---
 
     def show_notification(self, is_rest_prompt=False, is_work_prompt=False, from_tray_click=False):
+        if not self.started:
+            return  # Отложенный запуск ещё не дошёл до первой фазы
         if is_rest_prompt:
             current_eval_mode = "rest_prompt"
         elif is_work_prompt:
@@ -827,11 +2058,11 @@ class ProductivityApp:
         else:
             current_eval_mode = self.current_mode
         
-        if self.active_notification:
-            if self.active_notification.mode_key == current_eval_mode and not from_tray_click:
-                self.active_notification.activateWindow()
+        active = self.active_notification
+        if active and not active.closing and not self.notifications.dismiss_pending:
+            if active.mode_key == current_eval_mode and not from_tray_click:
+                active.activateWindow()
                 return
-            self.active_notification.fade_out()
         
         title, timer_text, buttons = "", "", []
         persistent = False
@@ -841,38 +2072,38 @@ class ProductivityApp:
             title = "Пора отдохнуть!"
             timer_text = self.format_time(self.rest_duration_sec)
             buttons = [
-                {"text": f"Отложить ({self.config_manager.postpone_minutes}м)", "command": self.postpone_rest_action, "style": ""},
-                {"text": "Начать отдых", "command": self.start_rest_action, "style": "Primary"}
+                {"id": "postpone_rest", "text": f"Отложить ({self.config_manager.postpone_minutes}м)", "command": self.postpone_rest_action, "style": ""},
+                {"id": "start_rest", "text": "Начать отдых", "command": self.start_rest_action, "style": "Primary"}
             ]
             persistent = False
         # Таймер работы
         elif current_eval_mode == "work":
             title = "Работаем"
-            timer_text = self.format_time(max(0, int(self.current_phase_end_time - time.time())))
-            buttons = [{"text": "Завершить работу", "command": self.start_rest_action, "style": ""}]
+            timer_text = self.format_time(max(0, int(self.current_phase_end_time - self.clock.now())))
+            buttons = [{"id": "start_rest", "text": "Завершить работу", "command": self.start_rest_action, "style": ""}]
         # Таймер отдыха
         elif current_eval_mode == "rest":
             title = "Отдыхаем"
-            timer_text = self.format_time(max(0, int(self.current_phase_end_time - time.time())))
-            buttons = [{"text": "Вернуться к работе", "command": self.start_work_action, "style": ""}]
+            timer_text = self.format_time(max(0, int(self.current_phase_end_time - self.clock.now())))
+            buttons = [{"id": "start_work", "text": "Вернуться к работе", "command": self.start_work_action, "style": ""}]
         # Предложение начать работу
         elif current_eval_mode == "work_prompt":
             title = "Пора работать!"
             timer_text = self.format_time(self.work_duration_sec)
             buttons = [
-                {"text": f"Отложить ({self.config_manager.postpone_minutes}м)", "command": self.postpone_work_action, "style": ""},
-                {"text": "Начать работать", "command": self.start_work_action, "style": "Primary"}
+                {"id": "postpone_work", "text": f"Отложить ({self.config_manager.postpone_minutes}м)", "command": self.postpone_work_action, "style": ""},
+                {"id": "start_work", "text": "Начать работать", "command": self.start_work_action, "style": "Primary"}
             ]
             persistent = False
         # Таймер отложенного состояния
         elif current_eval_mode == "postponed":
-            timer_text = self.format_time(max(0, int(self.current_phase_end_time - time.time())))
-            if hasattr(self, 'postponed_from_work') and self.postponed_from_work:
+            timer_text = self.format_time(max(0, int(self.current_phase_end_time - self.clock.now())))
+            if self.postponed_from_work:
                 title = "Работа отложена"
-                buttons = [{"text": "Начать работать", "command": self.start_work_action, "style": ""}]
+                buttons = [{"id": "start_work", "text": "Начать работать", "command": self.start_work_action, "style": ""}]
             else:
                 title = "Отдых отложен"
-                buttons = [{"text": "Начать отдых", "command": self.start_rest_action, "style": ""}]
+                buttons = [{"id": "start_rest", "text": "Начать отдых", "command": self.start_rest_action, "style": ""}]
         # Неактивные часы
         elif current_eval_mode == "idle_inactive_hours":
             title = "Приложение спит"
@@ -880,17 +2111,23 @@ class ProductivityApp:
         else:
             return
     
-        self.active_notification = CustomNotification(
-            self, current_eval_mode, title, timer_text, buttons, persistent, self.config_manager.notif_timeout * 1000
+        self.notifications.request(
+            current_eval_mode, title, timer_text, buttons, persistent, self.config_manager.notif_timeout * 1000
         )
-        self.active_notification.closed.connect(self._on_notification_closed)
         self.update_display_elements()
-    
-    def _on_notification_closed(self):
-        self.active_notification = None
+
+    @property
+    def active_notification(self):
+        return self.notifications.active
+
+    def _create_notification(self, mode_key, title, timer_text, buttons, persistent, timeout_ms):
+        backend = self._notification_backend()
+        if backend:
+            return backend.show(mode_key, title, timer_text, buttons, persistent, timeout_ms)
+        return CustomNotification(self, mode_key, title, timer_text, buttons, persistent, timeout_ms)
     
     def _handle_action(self, action_func):
-        if self.active_notification: self.active_notification.fade_out()
+        self.notifications.dismiss()
         action_func()
     
     # --- УПРОЩЕННЫЕ И ЕДИНСТВЕННО ВЕРНЫЕ ДЕЙСТВИЯ ---
@@ -926,6 +2163,12 @@ class ProductivityApp:
         self.postponed_from_work = True
         self._handle_action(lambda: self._set_mode_and_start("postponed"))
     
+    def show_stats_window(self):
+        if not self.stats_window or not self.stats_window.isVisible():
+            self.stats_window = StatsWindow(self)
+            self.stats_window.show()
+        self.stats_window.activateWindow()
+
     def show_settings_window(self):
         if not self.settings_window or not self.settings_window.isVisible():
             self.settings_window = SettingsWindow(self)
@@ -933,14 +2176,27 @@ class ProductivityApp:
         self.settings_window.activateWindow()
     
     def setup_tray_icon(self):
-        self.tray_icon = QSystemTrayIcon(QIcon(DEFAULT_ICON_PATH))
+        self.tray_icon = QSystemTrayIcon(ASSETS.icon(APP_ICON_PNG))
         self.tray_icon.setToolTip("Таймер продуктивности")
         
         menu = QMenu()
         show_action = QAction("Показать уведомление", self.app)
         show_action.triggered.connect(lambda: self.show_notification(from_tray_click=True))
         menu.addAction(show_action)
+
+        task_menu = menu.addMenu("Задача")
+        task_menu.aboutToShow.connect(lambda: self._populate_task_menu(task_menu))
+        task_stats_menu = menu.addMenu("Сегодня по задачам")
+        task_stats_menu.aboutToShow.connect(lambda: self._populate_task_stats_menu(task_stats_menu))
+        stats_action = QAction("Статистика", self.app)
+        stats_action.triggered.connect(self.show_stats_window)
+        menu.addAction(stats_action)
     
+        dashboard_action = QAction("Открыть веб-панель", self.app)
+        dashboard_action.triggered.connect(self.open_dashboard)
+        menu.addAction(dashboard_action)
+        menu.aboutToShow.connect(lambda: dashboard_action.setVisible(self.dashboard is not None))
+
         settings_action = QAction("Настройки", self.app)
         settings_action.triggered.connect(self.show_settings_window)
         menu.addAction(settings_action)
@@ -954,17 +2210,30 @@ class ProductivityApp:
         self.tray_icon.activated.connect(lambda reason: self.show_notification(from_tray_click=True) if reason == QSystemTrayIcon.ActivationReason.Trigger else None)
     
     def quit_app(self):
-        if self.active_notification: self.active_notification.close()
+        if self.sync_client: self.sync_client.stop()
+        if self.control_server: self.control_server.stop()
+        if self.dashboard: self.dashboard.stop()
+        # Закрываем текущий отрезок и пишем снимок с его концом: после перезапуска
+        # отсчёт продолжится с момента выхода, и уже засчитанное время не повторится
+        self._account_segment(self.clock.now())
+        self._flush_tasks()
+        self._save_state()
+        self.notifications.close_now()
         if self.settings_window: self.settings_window.close()
+        if self.stats_window: self.stats_window.close()
         self.tray_icon.hide()
         self.app.quit()
 
 if __name__ == "__main__":
-    if not os.path.exists("assets"): os.makedirs("assets")
-    
+    workdir = workdir_from_args(sys.argv[1:])
+    if workdir:
+        try:
+            os.chdir(workdir)
+        except OSError as e:
+            print(f"Не удалось перейти в каталог {workdir}: {e}")
     app = QApplication(sys.argv)
     app.setQuitOnLastWindowClosed(False) # Приложение не закрывается, если закрыть все окна
     
-    prod_app = ProductivityApp(app)
+    prod_app = ProductivityApp(app, autostart=AUTOSTART_FLAG in sys.argv[1:])
     
     sys.exit(app.exec())
\ No newline at end of file
@@ -1,11 +1,20 @@
 # -*- mode: python ; coding: utf-8 -*-
+import shutil
+import subprocess
+
+# Ресурсы упаковываются в один скомпилированный assets.rcc, если доступен rcc из Qt.
+# Без него в сборку, как и раньше, кладётся папка assets.
+assets_datas = [('assets', 'assets')]
+rcc = shutil.which('rcc') or shutil.which('pyside6-rcc')
+if rcc and subprocess.run([rcc, '-binary', 'assets.qrc', '-o', 'assets.rcc']).returncode == 0:
+    assets_datas = [('assets.rcc', '.')]
 
 
 a = Analysis(
     ['ProcrastiNOT.py'],
     pathex=[],
     binaries=[],
-    datas=[('assets', 'assets')],
+    datas=assets_datas,
     hiddenimports=[],
     hookspath=[],
     hooksconfig={},
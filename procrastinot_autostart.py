@@ -0,0 +1,152 @@
+# procrastinot_autostart.py
+# Запуск при входе в систему и журнал времени старта.
+# Linux/BSD: ярлык ~/.config/autostart/procrastinot.desktop (XDG Autostart),
+# Windows: значение в HKCU\Software\Microsoft\Windows\CurrentVersion\Run.
+# Приложение, запущенное так, получает флаг --autostart и поднимается поэтапно.
+# Модуль не зависит от Qt.
+
+import os
+import sys
+import time
+
+from procrastinot_state import state_dir
+
+AUTOSTART_FLAG = "--autostart"
+WORKDIR_FLAG = "--workdir"  # settings.ini ищется в текущем каталоге, а при входе в систему он другой
+AUTOSTART_NAME = "ProcrastiNOT"
+WINDOWS_RUN_KEY = r"Software\Microsoft\Windows\CurrentVersion\Run"
+STARTUP_LOG = os.path.join(state_dir(), "startup.log")
+STARTUP_LOG_LINES = 200  # Старые запуски отбрасываем, журнал не растёт бесконечно
+
+
+def desktop_file():
+    config_home = os.environ.get("XDG_CONFIG_HOME") or os.path.join(os.path.expanduser("~"), ".config")
+    return os.path.join(config_home, "autostart", "procrastinot.desktop")
+
+
+def is_supported():
+    return sys.platform != "darwin"
+
+
+def launch_command(script, workdir=None):
+    """ Команда запуска: собранный exe или интерпретатор со скриптом, плюс флаг автозапуска """
+    flags = [AUTOSTART_FLAG, WORKDIR_FLAG, os.path.abspath(workdir or os.getcwd())]
+    if getattr(sys, "frozen", False):
+        return [sys.executable] + flags
+    return [sys.executable, os.path.abspath(script)] + flags
+
+
+def workdir_from_args(argv):
+    """ Каталог из --workdir <путь> или None """
+    if WORKDIR_FLAG in argv:
+        i = argv.index(WORKDIR_FLAG)
+        if i + 1 < len(argv):
+            return argv[i + 1]
+    return None
+
+
+def _quote(arg):
+    # Кавычки и экранирование по правилам ключа Exec= спецификации Desktop Entry
+    if not arg or any(c in arg for c in ' \t"\\$`'):
+        return '"' + arg.replace("\\", "\\\\").replace('"', '\\"').replace("$", "\\$").replace("`", "\\`") + '"'
+    return arg
+
+
+def _windows_command(command):
+    return " ".join(f'"{arg}"' if " " in arg else arg for arg in command)
+
+
+def desktop_entry(command, icon=""):
+    lines = [
+        "[Desktop Entry]",
+        "Type=Application",
+        f"Name={AUTOSTART_NAME}",
+        "Comment=Таймер работы и отдыха",
+        "Exec=" + " ".join(_quote(arg) for arg in command),
+        "Terminal=false",
+        "X-GNOME-Autostart-enabled=true",
+    ]
+    if icon:
+        lines.append(f"Icon={icon}")
+    return "\n".join(lines) + "\n"
+
+
+def is_enabled():
+    if sys.platform == "win32":
+        import winreg
+        try:
+            with winreg.OpenKey(winreg.HKEY_CURRENT_USER, WINDOWS_RUN_KEY) as key:
+                winreg.QueryValueEx(key, AUTOSTART_NAME)
+            return True
+        except OSError:
+            return False
+    return os.path.exists(desktop_file())
+
+
+def set_enabled(enabled, script, icon=""):
+    """ Создаёт или удаляет запись автозапуска; OSError пробрасывается вызывающему """
+    if not is_supported():
+        raise OSError("автозапуск на этой платформе не поддерживается")
+    command = launch_command(script)
+    if sys.platform == "win32":
+        import winreg
+        with winreg.OpenKey(winreg.HKEY_CURRENT_USER, WINDOWS_RUN_KEY, 0, winreg.KEY_SET_VALUE) as key:
+            if enabled:
+                winreg.SetValueEx(key, AUTOSTART_NAME, 0, winreg.REG_SZ, _windows_command(command))
+            else:
+                try:
+                    winreg.DeleteValue(key, AUTOSTART_NAME)
+                except FileNotFoundError:
+                    pass
+        return
+    path = desktop_file()
+    if not enabled:
+        if os.path.exists(path):
+            os.remove(path)
+        return
+    entry = desktop_entry(command, icon)
+    try:
+        with open(path, encoding="utf-8") as f:
+            if f.read() == entry:
+                return  # Запись уже актуальна
+    except OSError:
+        pass
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(entry)
+    os.replace(tmp_path, path)
+
+
+class StartupLog:
+    """
+    Отметки этапов запуска в миллисекундах от t0 (perf_counter при импорте модуля
+    приложения). write() дописывает одну строку на запуск в startup.log.
+    """
+    def __init__(self, t0, autostart=False, path=STARTUP_LOG):
+        self.t0 = t0
+        self.autostart = autostart
+        self.path = path
+        self.marks = []
+
+    def mark(self, name):
+        self.marks.append((name, (time.perf_counter() - self.t0) * 1000))
+
+    def line(self):
+        stamp = time.strftime("%Y-%m-%d %H:%M:%S")
+        kind = "autostart" if self.autostart else "manual"
+        return f"{stamp} {kind} " + " ".join(f"{name}={ms:.0f}ms" for name, ms in self.marks)
+
+    def write(self):
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            try:
+                with open(self.path, encoding="utf-8") as f:
+                    lines = f.read().splitlines()[-(STARTUP_LOG_LINES - 1):]
+            except OSError:
+                lines = []
+            lines.append(self.line())
+            with open(self.path, "w", encoding="utf-8") as f:
+                f.write("\n".join(lines) + "\n")
+        except OSError as e:
+            print(f"Не удалось записать журнал запуска: {e}")
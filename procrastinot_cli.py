@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+# procrastinot_cli.py
+# Консольный интерфейс ProcrastiNOT без PyQt6: быстро стартует, поэтому его можно
+# вызывать из приглашения оболочки или статус-бара каждые несколько секунд.
+#
+#   procrastinot status | start-work | start-rest | postpone | next-transition | today [--json]
+#
+# Если приложение запущено, команды идут ему через procrastinot_control,
+# иначе состояние читается напрямую из файла снимка.
+
+import sys
+import time
+
+from procrastinot_state import STATE_FILE, load_state, account_phase, local_day, new_totals
+from procrastinot_control import send_command
+
+MODE_TITLES = {
+    "work": "Работа",
+    "rest": "Отдых",
+    "postponed": "Отложено",
+    "rest_prompt": "Переработка",
+    "work_prompt": "Пропуск работы",
+    "idle_inactive_hours": "Спит",
+}
+
+# Что наступит по окончании фазы (так же, как в update_timer_tick)
+NEXT_MODE = {"work": "rest_prompt", "rest": "work_prompt", "postponed": "rest_prompt"}
+
+
+def format_time(seconds):
+    m, s = divmod(int(seconds), 60)
+    return f"{m:02d}:{s:02d}"
+
+
+def format_duration(seconds):
+    h, m = divmod(int(seconds) // 60, 60)
+    return f"{h}ч {m:02d}м" if h else f"{m}м"
+
+
+def offline_status(now):
+    """ Состояние из файла снимка, когда приложение не запущено """
+    state = load_state(STATE_FILE)
+    if state is None:
+        return None
+    state["running"] = False
+    state["now"] = now
+    if state["mode"] in NEXT_MODE and state["phase_end"] <= now:
+        # Фаза истекла без приложения — при запуске оно покажет то же самое
+        state["totals"] = account_phase(state["totals"], state["mode"], state["postponed_from_work"],
+                                        state["phase_start"], state["phase_end"])
+        state["mode"] = NEXT_MODE[state["mode"]]
+        state["overtime_start"] = state["phase_end"]
+    if state["totals"]["day"] != local_day(now):
+        # Итоги в снимке за прошлый день — сегодня ещё ничего не было (как в _restore_state)
+        state["totals"] = new_totals(local_day(now))
+    return state
+
+
+def describe(state, command):
+    mode, now = state["mode"], state["now"]
+    if command == "today":
+        t = state["totals"]
+        return (f"Работа {format_duration(t['work'])} · Отдых {format_duration(t['rest'])} · "
+                f"Переработка {format_duration(t['overtime'])} · Отсрочек {t['postpones']}")
+    if mode in ("rest_prompt", "work_prompt"):
+        text = f"{MODE_TITLES[mode]}: {format_time(now - state['overtime_start'])}"
+    elif mode in NEXT_MODE:
+        remaining = max(0, state["phase_end"] - now)
+        if command == "next-transition":
+            end = time.strftime("%H:%M:%S", time.localtime(state["phase_end"]))
+            return f"{end} (через {format_time(remaining)}) → {MODE_TITLES[NEXT_MODE[mode]]}"
+        text = f"{MODE_TITLES[mode]}: {format_time(remaining)}"
+    else:
+        text = MODE_TITLES.get(mode, mode)
+    if command == "next-transition":
+        return "Ожидает действия: " + text
+    return text if state["running"] else text + " (не запущено)"
+
+
+COMMANDS = ("status", "start-work", "start-rest", "postpone", "next-transition", "today")
+USAGE = "usage: procrastinot {" + ",".join(COMMANDS) + "} [--json]"
+
+
+def main(argv=None):
+    # argparse не используем: он заметно удлиняет холодный старт
+    argv = sys.argv[1:] if argv is None else argv
+    as_json = "--json" in argv
+    args = [a for a in argv if a != "--json"]
+    if len(args) != 1 or args[0] not in COMMANDS:
+        print(USAGE, file=sys.stderr)
+        return 2
+    command = args[0]
+
+    remote_cmd = command if command in ("start-work", "start-rest", "postpone") else "status"
+    response = send_command(remote_cmd)
+    if response is not None:
+        if not response.get("ok"):
+            print(f"Ошибка: {response.get('error')}", file=sys.stderr)
+            return 1
+        state = response["status"]
+        state["running"] = True
+    elif remote_cmd != "status":
+        print("ProcrastiNOT не запущен", file=sys.stderr)
+        return 1
+    else:
+        state = offline_status(time.time())
+        if state is None:
+            print("Нет сохранённого состояния", file=sys.stderr)
+            return 1
+
+    if as_json:
+        import json
+        print(json.dumps(state, ensure_ascii=False))
+    else:
+        print(describe(state, command))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
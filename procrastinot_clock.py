@@ -0,0 +1,69 @@
+# procrastinot_clock.py
+# Часы для таймеров: отсчёт идёт по монотонным часам, а наружу отдаются
+# метки времени в шкале time.time(), чтобы их можно было сохранять и синхронизировать.
+# Сервис замечает сон/пробуждение (большой разрыв между тиками) и скачки
+# системного времени (NTP, ручная правка, перевод часов) и сообщает о них.
+# Модуль не зависит от Qt.
+
+import sys
+import time
+
+SUSPEND_POLICIES = {
+    "rest": "Считать отдыхом",
+    "pause": "Ставить на паузу",
+    "continue": "Продолжать отсчёт",
+}
+
+
+def _elapsed_clock():
+    """ Монотонные часы, которые идут и во время сна системы """
+    if hasattr(time, "CLOCK_BOOTTIME"):  # Linux: CLOCK_MONOTONIC останавливается на время сна
+        return lambda: time.clock_gettime(time.CLOCK_BOOTTIME)
+    if sys.platform == "darwin":  # macOS: CLOCK_MONOTONIC учитывает сон, в отличие от time.monotonic
+        return lambda: time.clock_gettime(time.CLOCK_MONOTONIC)
+    return time.monotonic  # Windows: GetTickCount64 учитывает сон
+
+
+class ClockService:
+    """
+    now() — текущее время в шкале time.time(), но без скачков: между проверками
+    оно растёт строго по монотонным часам. check() вызывается на каждом тике и
+    возвращает события:
+      ("suspend", start, duration) — система спала (или процесс стоял) duration секунд;
+      ("wall_jump", delta) — системное время сдвинулось на delta секунд; шкала now()
+        сдвигается вместе с ним, поэтому сохранённые метки нужно сдвинуть на delta.
+    """
+    def __init__(self, suspend_threshold=30.0, jump_threshold=2.0, elapsed=None, wall=time.time):
+        self.suspend_threshold = suspend_threshold
+        self.jump_threshold = jump_threshold
+        self._elapsed = elapsed or _elapsed_clock()
+        self._wall = wall
+        self._anchor_elapsed = self._elapsed()
+        self._anchor_wall = wall()
+        self._last_check = self._anchor_elapsed
+
+    def now(self):
+        return self._anchor_wall + (self._elapsed() - self._anchor_elapsed)
+
+    def reset(self):
+        """ Начинает отсчёт пауз заново: время с прошлой проверки не будет принято за сон """
+        self._last_check = self._elapsed()
+
+    def check(self):
+        events = []
+        elapsed = self._elapsed()
+        gap = elapsed - self._last_check
+        if gap > self.suspend_threshold:
+            events.append(("suspend", self._anchor_wall + (self._last_check - self._anchor_elapsed), gap))
+        self._last_check = elapsed
+
+        drift = self._wall() - (self._anchor_wall + (elapsed - self._anchor_elapsed))
+        if abs(drift) > self.jump_threshold:
+            self._anchor_wall += drift
+            events.append(("wall_jump", drift))
+        return events
+
+    def ms_until_next_second(self, reference):
+        """ Задержка до момента, когда целое число секунд от reference сменится """
+        fraction = (self.now() - reference) % 1.0
+        return max(50, int((1.0 - fraction) * 1000) + 5)
@@ -0,0 +1,83 @@
+# procrastinot_control.py
+# Локальный канал управления запущенным экземпляром ProcrastiNOT.
+# Сервер слушает 127.0.0.1 на случайном порту и записывает "порт токен"
+# в control.port в каталоге состояния; клиент (procrastinot_cli.py) читает
+# этот файл. Запрос и ответ — по одной JSON-строке. Модуль не зависит от Qt.
+
+import os
+
+from procrastinot_state import state_dir
+
+CONTROL_FILE = os.path.join(state_dir(), "control.port")
+CONTROL_COMMANDS = ("status", "start-work", "start-rest", "postpone")
+CONTROL_REPLY_TIMEOUT = 2.0  # Сколько сервер ждёт GUI-поток; клиент ждёт дольше, чтобы получить ответ
+
+
+class ControlServer:
+    """ handler(request) -> dict вызывается в фоновом потоке сервера """
+    def __init__(self, handler, path=CONTROL_FILE):
+        # Серверные модули импортируем здесь, чтобы не замедлять запуск CLI
+        import json
+        import secrets
+        import threading
+        import socketserver
+
+        class _Handler(socketserver.StreamRequestHandler):
+            def handle(inner):
+                try:
+                    request = json.loads(inner.rfile.readline())
+                except ValueError:
+                    return
+                if not isinstance(request, dict) or request.get("token") != self.token:
+                    response = {"ok": False, "error": "bad token"}
+                else:
+                    response = handler(request)
+                inner.wfile.write((json.dumps(response) + "\n").encode("utf-8"))
+
+        class _Server(socketserver.ThreadingTCPServer):
+            daemon_threads = True
+
+        self.path = path
+        self.token = secrets.token_hex(16)
+        self.server = _Server(("127.0.0.1", 0), _Handler)
+        self.thread = threading.Thread(target=self.server.serve_forever, name="procrastinot-control", daemon=True)
+
+    def start(self):
+        self.thread.start()
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        # Токен защищает от команд других пользователей той же машины
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w") as f:
+            f.write(f"{self.server.server_address[1]} {self.token}\n")
+        os.replace(tmp_path, self.path)
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+
+def send_command(cmd, path=CONTROL_FILE, timeout=CONTROL_REPLY_TIMEOUT + 1.0):
+    """ Отправляет команду запущенному приложению. None — если оно не запущено """
+    try:
+        with open(path) as f:
+            port, token = f.read().split()
+    except (OSError, ValueError):
+        return None
+    # socket и json импортируем только здесь: без запущенного приложения CLI стартует быстрее
+    import json
+    import socket
+    try:
+        with socket.create_connection(("127.0.0.1", int(port)), timeout=timeout) as sock:
+            sock.sendall((json.dumps({"cmd": cmd, "token": token}) + "\n").encode("utf-8"))
+            line = sock.makefile("r", encoding="utf-8").readline()
+    except (OSError, ValueError):
+        return None
+    try:
+        return json.loads(line)
+    except ValueError:
+        return None
@@ -0,0 +1,199 @@
+# procrastinot_dashboard.py
+# Локальная веб-панель: таймер и итоги дня в браузере.
+# Сервер работает на asyncio-цикле в отдельном потоке; приложение только
+# вызывает publish() при смене фазы, а страница получает обновления через
+# Server-Sent Events. Каждое состояние сериализуется один раз и рассылается
+# всем вкладкам, поэтому их число не добавляет работы GUI-потоку.
+
+import json
+import asyncio
+import threading
+
+DEFAULT_DASHBOARD_PORT = 48767
+KEEPALIVE_SECONDS = 15
+
+PAGE = """<!DOCTYPE html>
+<html lang="ru">
+<head>
+<meta charset="utf-8">
+<title>ProcrastiNOT</title>
+<style>
+  body { background: #1e1e1e; color: #e0e0e0; font-family: "Montserrat", "Segoe UI", sans-serif;
+         display: flex; flex-direction: column; align-items: center; margin-top: 8vh; }
+  #mode { font-size: 16pt; font-weight: bold; }
+  #timer { font-size: 64pt; font-weight: bold; color: #f3a500; margin: 10px 0 30px; }
+  table { border-collapse: collapse; min-width: 320px; }
+  td { padding: 8px 16px; border-bottom: 1px solid #444; }
+  td:last-child { text-align: right; font-weight: bold; }
+  #offline { color: #ff4d4d; margin-top: 20px; visibility: hidden; }
+</style>
+</head>
+<body>
+<div id="mode">…</div>
+<div id="timer">--:--</div>
+<table>
+  <tr><td>Работа</td><td id="work">0м</td></tr>
+  <tr><td>Отдых</td><td id="rest">0м</td></tr>
+  <tr><td>Переработка</td><td id="overtime">0м</td></tr>
+  <tr><td>Отсрочек</td><td id="postpones">0</td></tr>
+</table>
+<div id="offline">Нет связи с приложением</div>
+<script>
+const TITLES = {work: "Работа", rest: "Отдых", postponed: "Отложено", rest_prompt: "Пора отдохнуть!",
+                work_prompt: "Пора работать!", idle_inactive_hours: "Спит (вне часов)"};
+const COLORS = {work: "#f3a500", rest: "#f33100", rest_prompt: "#64bc64", work_prompt: "#64a4d9",
+                postponed: "#ffffff", idle_inactive_hours: "#777777"};
+let state = null, skew = 0;
+const pad = n => String(n).padStart(2, "0");
+const clock = s => pad(Math.floor(s / 60)) + ":" + pad(Math.floor(s % 60));
+const duration = s => { const m = Math.floor(s / 60), h = Math.floor(m / 60);
+                        return h ? h + "ч " + pad(m % 60) + "м" : m + "м"; };
+function render() {
+  if (!state || !state.totals) return;
+  const now = Date.now() / 1000 - skew;
+  const prompt = state.mode === "rest_prompt" || state.mode === "work_prompt";
+  document.getElementById("mode").textContent = TITLES[state.mode] || state.mode;
+  const timer = document.getElementById("timer");
+  timer.style.color = COLORS[state.mode] || "#ffffff";
+  timer.textContent = state.mode === "idle_inactive_hours" ? "--:--"
+      : clock(Math.max(0, prompt ? now - state.overtime_start : state.phase_end - now));
+  const live = Math.max(0, now - state.now);
+  for (const key of ["work", "rest", "overtime"]) {
+    const extra = state.bucket === key ? live : 0;
+    document.getElementById(key).textContent = duration(state.totals[key] + extra);
+  }
+  document.getElementById("postpones").textContent = state.totals.postpones;
+}
+const source = new EventSource("/events");
+source.onmessage = e => { state = JSON.parse(e.data); skew = Date.now() / 1000 - state.now; render();
+                          document.getElementById("offline").style.visibility = "hidden"; };
+source.onerror = () => { document.getElementById("offline").style.visibility = "visible"; };
+setInterval(render, 1000);
+</script>
+</body>
+</html>
+"""
+PAGE_BYTES = PAGE.encode("utf-8")
+
+
+class DashboardServer:
+    """ HTTP-сервер панели. publish() можно вызывать из любого потока """
+    def __init__(self, host="127.0.0.1", port=DEFAULT_DASHBOARD_PORT):
+        self.host = host
+        self.port = port
+        self.loop = None
+        self.thread = None
+        self.server = None
+        self.subscribers = set()
+        self.connections = set()  # Задачи открытых соединений, отменяются при остановке
+        self.state_json = b"{}"
+        self._ready = threading.Event()
+        self._error = None
+
+    def start(self):
+        """ Запускает поток с циклом asyncio; OSError, если порт занят """
+        self.thread = threading.Thread(target=self._run, name="procrastinot-dashboard", daemon=True)
+        self.thread.start()
+        self._ready.wait(5)
+        if self._error:
+            raise self._error
+
+    def stop(self, timeout=5):
+        """ Закрывает сервер и соединения в его потоке и ждёт завершения потока """
+        loop, self.loop = self.loop, None
+        if loop and not loop.is_closed():
+            try:
+                asyncio.run_coroutine_threadsafe(self._shutdown(), loop).result(timeout)
+            except Exception as e:
+                print(f"Не удалось штатно остановить веб-панель: {e}")
+            loop.call_soon_threadsafe(loop.stop)
+        if self.thread and self.thread is not threading.current_thread():
+            self.thread.join(timeout)
+
+    def publish(self, state):
+        payload = json.dumps(state, ensure_ascii=False).encode("utf-8")
+        loop = self.loop
+        if loop:
+            try:
+                loop.call_soon_threadsafe(self._broadcast, payload)
+            except RuntimeError:
+                pass  # Цикл как раз закрывается в stop()
+
+    def _run(self):
+        # Цикл держим в локальной переменной: stop() обнуляет self.loop из другого потока
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        try:
+            self.server = loop.run_until_complete(asyncio.start_server(self._handle, self.host, self.port))
+        except OSError as e:
+            self._error = e
+            loop.close()
+            self._ready.set()
+            return
+        self.loop = loop
+        self._ready.set()
+        try:
+            loop.run_forever()
+        finally:
+            loop.close()
+
+    async def _shutdown(self):
+        self.server.close()
+        for task in list(self.connections):
+            task.cancel()
+        await asyncio.gather(*self.connections, return_exceptions=True)
+        await self.server.wait_closed()
+
+    def _broadcast(self, payload):
+        # Выполняется в потоке сервера: кэшируем и раздаём всем подписчикам
+        self.state_json = payload
+        for queue in self.subscribers:
+            if queue.full():
+                queue.get_nowait()  # Вкладке нужно только последнее состояние
+            queue.put_nowait(payload)
+
+    async def _handle(self, reader, writer):
+        task = asyncio.current_task()
+        self.connections.add(task)
+        try:
+            request_line = await reader.readline()
+            while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                pass
+            parts = request_line.decode("latin-1").split()
+            path = parts[1] if len(parts) > 1 else "/"
+            if path == "/events":
+                await self._serve_events(writer)
+            elif path == "/state":
+                await self._respond(writer, "200 OK", "application/json; charset=utf-8", self.state_json)
+            elif path == "/":
+                await self._respond(writer, "200 OK", "text/html; charset=utf-8", PAGE_BYTES)
+            else:
+                await self._respond(writer, "404 Not Found", "text/plain; charset=utf-8", b"Not found")
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.CancelledError):
+            pass  # Отмена — это остановка сервера из stop(), задача завершается штатно
+        finally:
+            self.connections.discard(task)
+            writer.close()
+
+    async def _respond(self, writer, status, content_type, body):
+        writer.write(f"HTTP/1.1 {status}\r\nContent-Type: {content_type}\r\n"
+                     f"Content-Length: {len(body)}\r\nCache-Control: no-store\r\nConnection: close\r\n\r\n"
+                     .encode("latin-1") + body)
+        await writer.drain()
+
+    async def _serve_events(self, writer):
+        queue = asyncio.Queue(maxsize=1)
+        queue.put_nowait(self.state_json)
+        self.subscribers.add(queue)
+        try:
+            writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\n"
+                         b"Cache-Control: no-store\r\nConnection: keep-alive\r\n\r\n")
+            while True:
+                try:
+                    payload = await asyncio.wait_for(queue.get(), KEEPALIVE_SECONDS)
+                    writer.write(b"data: " + payload + b"\n\n")
+                except asyncio.TimeoutError:
+                    writer.write(b": keepalive\n\n")  # Заодно замечаем закрытые вкладки
+                await writer.drain()
+        finally:
+            self.subscribers.discard(queue)
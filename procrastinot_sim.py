@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+# procrastinot_sim.py
+# Симулятор "что если": прогоняет тысячи конфигураций (работа, отдых, отсрочка,
+# активные часы) по записанным или синтетическим трассам активности и считает
+# для каждой время фокуса, переработку, отсрочки и прерывания.
+#
+# Трасса — массив bool формы (дни, 1440): был ли пользователь активен в эту минуту.
+# Все конфигурации и дни считаются одновременно векторами NumPy; Python-цикл идёт
+# только по событиям (смене фаз), а не по минутам. Блоки конфигураций
+# распределяются по ядрам через пул процессов.
+#
+#   python procrastinot_sim.py --synthetic-days 365 --work 30:120:5 --rest 5:40:1 --postpone 5,10
+#   python procrastinot_sim.py --trace activity.npy --out results.csv
+
+import os
+import sys
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+MINUTES_PER_DAY = 1440
+
+# Состояния автомата, как в ProductivityApp
+WORK, REST_PROMPT, REST, WORK_PROMPT, DONE = range(5)
+
+RESULT_FIELDS = ("work_minutes", "rest_minutes", "postpone_minutes", "active_start_hour", "active_end_hour",
+                 "focus_minutes", "overtime_minutes", "postpones", "interruptions")
+
+
+def synthetic_traces(days, seed=0):
+    """ Правдоподобная активность: рабочий день со случайными границами и паузами """
+    rng = np.random.default_rng(seed)
+    minutes = np.arange(MINUTES_PER_DAY)
+    start = rng.normal(9 * 60, 40, size=(days, 1))
+    end = rng.normal(18 * 60, 60, size=(days, 1))
+    envelope = (minutes >= start) & (minutes < end)
+    # Сглаженный шум даёт серии активности и пауз длиной в десятки минут
+    noise = rng.random((days, MINUTES_PER_DAY + 30))
+    cs = np.cumsum(noise, axis=1)
+    smooth = (cs[:, 30:] - cs[:, :-30]) / 30
+    return envelope & (smooth > 0.47)
+
+
+def _next_index(mask):
+    """ Для каждой минуты t — первая минута >= t, где mask истинна (или 1440) """
+    days = mask.shape[0]
+    idx = np.where(mask, np.arange(MINUTES_PER_DAY), MINUTES_PER_DAY)
+    idx = np.concatenate([idx, np.full((days, 1), MINUTES_PER_DAY)], axis=1)
+    return np.minimum.accumulate(idx[:, ::-1], axis=1)[:, ::-1]
+
+
+class TraceIndex:
+    """ Предрасчёт по трассе, который делит между собой все конфигурации """
+    def __init__(self, activity):
+        activity = np.asarray(activity, dtype=bool)
+        self.days = activity.shape[0]
+        self.active = np.concatenate([activity, np.zeros((self.days, 1), dtype=bool)], axis=1)
+        self.cumsum = np.concatenate([np.zeros((self.days, 1), dtype=np.int32),
+                                      np.cumsum(activity, axis=1, dtype=np.int32)], axis=1)
+        self.next_idle = _next_index(~activity)
+        self.next_active = _next_index(activity)
+
+
+def simulate(trace, work, rest, postpone, start_hour, end_hour, max_postpones=2):
+    """
+    Векторная симуляция. Параметры конфигураций — массивы одинаковой длины C.
+    Возвращает словарь массивов формы (C,) с суммами по всем дням трассы.
+
+    Модель пользователя: на предложение отдохнуть он соглашается, если неактивен;
+    если занят — откладывает (не более max_postpones раз подряд), а потом дорабатывает
+    до первой паузы (это переработка). После отдыха возвращается с первой активной минутой.
+    Прерывание — предложение отдохнуть, пришедшее во время активности.
+    """
+    # Нулевая работа или отсрочка зациклили бы автомат, как и в ConfigManager минимум — 1 минута
+    work, rest, postpone = (np.maximum(np.asarray(a, dtype=np.int32), 1) for a in (work, rest, postpone))
+    configs, days = work.shape[0], trace.days
+    shape = (configs, days)
+
+    day = np.broadcast_to(np.arange(days, dtype=np.int32), shape).ravel()
+    cfg = np.repeat(np.arange(configs), days)
+    w, r, p = work[cfg], rest[cfg], postpone[cfg]
+    t = (np.asarray(start_hour, dtype=np.int32)[cfg] * 60).clip(0, MINUTES_PER_DAY)
+    end = np.asarray(end_hour, dtype=np.int32)[cfg] * 60
+    end = np.where(end > t, end, MINUTES_PER_DAY)  # Ночные расписания не моделируем
+
+    state = np.full(t.shape, WORK, dtype=np.int8)
+    streak = np.zeros(t.shape, dtype=np.int32)
+    focus = np.zeros(t.shape, dtype=np.int32)
+    overtime = np.zeros(t.shape, dtype=np.int32)
+    postpones = np.zeros(t.shape, dtype=np.int32)
+    interruptions = np.zeros(t.shape, dtype=np.int32)
+
+    while True:
+        state[t >= end] = DONE
+        live = np.flatnonzero(state != DONE)
+        if live.size == 0:
+            break
+        s = state[live]
+
+        # Работа: фокус считается по фактической активности внутри фазы
+        i = live[s == WORK]
+        e = np.minimum(t[i] + w[i], end[i])
+        focus[i] += trace.cumsum[day[i], e] - trace.cumsum[day[i], t[i]]
+        t[i] = e
+        state[i] = REST_PROMPT
+
+        # Предложение отдохнуть
+        i = live[s == REST_PROMPT]
+        busy = trace.active[day[i], t[i]]
+        interruptions[i] += busy
+        can_postpone = busy & (streak[i] < max_postpones)
+        j = i[can_postpone]
+        e = np.minimum(t[j] + p[j], end[j])
+        focus[j] += trace.cumsum[day[j], e] - trace.cumsum[day[j], t[j]]
+        postpones[j] += 1
+        streak[j] += 1
+        t[j] = e
+        j = i[busy & ~can_postpone]
+        e = np.minimum(trace.next_idle[day[j], t[j]], end[j])
+        overtime[j] += e - t[j]
+        focus[j] += trace.cumsum[day[j], e] - trace.cumsum[day[j], t[j]]
+        t[j] = e
+        j = i[~can_postpone]
+        streak[j] = 0
+        state[j] = REST
+
+        # Отдых
+        i = live[s == REST]
+        t[i] = np.minimum(t[i] + r[i], end[i])
+        state[i] = WORK_PROMPT
+
+        # Предложение вернуться к работе: пользователь возвращается с первой активной минутой
+        i = live[s == WORK_PROMPT]
+        t[i] = np.minimum(trace.next_active[day[i], t[i]], end[i])
+        state[i] = WORK
+
+    def per_config(a):
+        return a.reshape(shape).sum(axis=1)
+
+    return {
+        "focus_minutes": per_config(focus),
+        "overtime_minutes": per_config(overtime),
+        "postpones": per_config(postpones),
+        "interruptions": per_config(interruptions),
+    }
+
+
+def config_grid(work, rest, postpone, start_hours, end_hours):
+    """ Декартово произведение списков параметров -> пять массивов одинаковой длины """
+    grid = np.meshgrid(work, rest, postpone, start_hours, end_hours, indexing="ij")
+    return [g.ravel().astype(np.int32) for g in grid]
+
+
+_worker_trace = None
+
+
+def _init_worker(activity):
+    global _worker_trace
+    _worker_trace = TraceIndex(activity)
+
+
+def _run_chunk(args):
+    configs, max_postpones = args
+    return simulate(_worker_trace, *configs, max_postpones=max_postpones)
+
+
+def sweep(activity, configs, max_postpones=2, workers=None, chunk_size=256):
+    """ Разбивает конфигурации на блоки и считает их параллельно на всех ядрах """
+    total = configs[0].shape[0]
+    chunks = [([c[i:i + chunk_size] for c in configs], max_postpones) for i in range(0, total, chunk_size)]
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count(),
+                             initializer=_init_worker, initargs=(activity,)) as pool:
+        parts = list(pool.map(_run_chunk, chunks))
+    results = {key: np.concatenate([part[key] for part in parts]) for key in parts[0]}
+    for name, values in zip(RESULT_FIELDS, configs):
+        results[name] = values
+    return results
+
+
+def parse_values(text):
+    """ "30:120:5" -> диапазон включительно, "5,10" -> список, "75" -> одно значение """
+    if ":" in text:
+        start, stop, step = (int(x) for x in (text.split(":") + ["1"])[:3])
+        return np.arange(start, stop + 1, step)
+    return np.array([int(x) for x in text.split(",")])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Симулятор расписаний ProcrastiNOT")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--trace", help="файл .npy с массивом bool (дни, 1440)")
+    source.add_argument("--synthetic-days", type=int, help="сгенерировать трассу на N дней")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--work", default="30:120:5", help="минуты работы (a:b:шаг или список)")
+    parser.add_argument("--rest", default="5:40:1", help="минуты отдыха")
+    parser.add_argument("--postpone", default="5,10", help="минуты отсрочки")
+    parser.add_argument("--start-hour", default="9", help="начало активных часов")
+    parser.add_argument("--end-hour", default="18", help="конец активных часов")
+    parser.add_argument("--max-postpones", type=int, default=2, help="сколько раз подряд пользователь откладывает")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--top", type=int, default=15, help="сколько лучших по фокусу вывести")
+    parser.add_argument("--out", help="сохранить все результаты в CSV")
+    args = parser.parse_args(argv)
+
+    if args.trace:
+        activity = np.load(args.trace).astype(bool)
+        if activity.ndim != 2 or activity.shape[1] != MINUTES_PER_DAY:
+            parser.error("трасса должна иметь форму (дни, 1440)")
+    else:
+        activity = synthetic_traces(args.synthetic_days, args.seed)
+
+    configs = config_grid(parse_values(args.work), parse_values(args.rest), parse_values(args.postpone),
+                          parse_values(args.start_hour), parse_values(args.end_hour))
+    results = sweep(activity, configs, args.max_postpones, args.workers)
+    table = np.column_stack([results[name] for name in RESULT_FIELDS])
+
+    if args.out:
+        np.savetxt(args.out, table, fmt="%d", delimiter=",", header=",".join(RESULT_FIELDS), comments="")
+    days = activity.shape[0]
+    print(f"Конфигураций: {table.shape[0]}, дней: {days}")
+    print("работа отдых отсрочка часы     фокус/день переработка/день отсрочек/день прерываний/день")
+    for row in table[np.argsort(-results["focus_minutes"])[:args.top]]:
+        print(f"{row[0]:6d} {row[1]:5d} {row[2]:9d} {row[3]:2d}-{row[4]:<2d}   "
+              f"{row[5] / days:11.1f} {row[6] / days:16.1f} {row[7] / days:13.2f} {row[8] / days:15.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
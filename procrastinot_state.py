@@ -0,0 +1,155 @@
+# procrastinot_state.py
+# Снимок состояния таймера для мгновенного продолжения после перезапуска.
+# Файл фиксированного формата (76 байт), пишется атомарно при смене фазы; между сменами
+# раз в минуту на месте обновляется только отметка «приложение ещё работало» (touch_state).
+# Модуль не импортирует Qt, поэтому его можно читать до создания любых виджетов
+# и из консольной утилиты procrastinot_cli.py.
+
+import os
+import sys
+import time
+import struct
+from datetime import date
+
+STATE_MAGIC = b"PNST"
+STATE_VERSION = 3
+
+# Порядок важен: индекс режима хранится в файле
+MODES = ("work", "rest", "postponed", "rest_prompt", "work_prompt", "idle_inactive_hours")
+
+# Версия 1: magic, версия, режим, postponed_from_work, выравнивание, конец фазы, начало переработки
+STATE_STRUCT_V1 = struct.Struct("<4sBBB5xdd")
+# Версия 2 добавляет начало фазы и итоги текущего дня:
+# день (ordinal), число отсрочек, секунды работы, отдыха и переработки
+STATE_STRUCT_V2 = struct.Struct("<4sBBB5xdddIIddd")
+# Версия 3 добавляет в конец отметку последнего времени, когда приложение точно работало:
+# по ней после сбоя или перезагрузки считается длительность простоя
+STATE_STRUCT = struct.Struct("<4sBBB5xdddIIdddd")
+LAST_ALIVE_OFFSET = STATE_STRUCT.size - 8
+
+TOTAL_FIELDS = ("work", "rest", "overtime")
+
+
+def state_dir():
+    """ Каталог для служебных файлов приложения (не зависит от текущего каталога) """
+    override = os.environ.get("PROCRASTINOT_HOME")
+    if override:
+        return override
+    if sys.platform == "win32":
+        base = os.environ.get("APPDATA") or os.path.expanduser("~")
+        return os.path.join(base, "ProcrastiNOT")
+    base = os.environ.get("XDG_STATE_HOME") or os.path.join(os.path.expanduser("~"), ".local", "state")
+    return os.path.join(base, "procrastinot")
+
+
+STATE_FILE = os.path.join(state_dir(), "timer.state")
+
+
+def local_day(ts):
+    """ Порядковый номер локальной даты для метки времени """
+    return date(*time.localtime(ts)[:3]).toordinal()
+
+
+def new_totals(day):
+    return {"day": day, "postpones": 0, "work": 0.0, "rest": 0.0, "overtime": 0.0}
+
+
+def phase_bucket(mode, postponed_from_work):
+    """ В какой итог идёт время фазы. Отложенный отдых — это работа, отложенная работа — отдых """
+    if mode == "postponed":
+        return "rest" if postponed_from_work else "work"
+    if mode in ("rest_prompt", "work_prompt"):
+        return "overtime"
+    if mode in ("work", "rest"):
+        return mode
+    return None
+
+
+def account_phase(totals, mode, postponed_from_work, start, end):
+    """
+    Добавляет длительность фазы [start, end) к итогам дня и возвращает актуальные итоги.
+    При смене дня итоги обнуляются, а в новый день попадает только время после полуночи.
+    """
+    day = local_day(end)
+    if totals["day"] != day:
+        totals = new_totals(day)
+        midnight = time.mktime(date.fromordinal(day).timetuple())
+        start = max(start, midnight)
+    bucket = phase_bucket(mode, postponed_from_work)
+    if bucket and end > start:
+        totals[bucket] += end - start
+    return totals
+
+
+def pack_state(state):
+    totals = state["totals"]
+    return STATE_STRUCT.pack(
+        STATE_MAGIC, STATE_VERSION, MODES.index(state["mode"]),
+        1 if state["postponed_from_work"] else 0,
+        float(state["phase_end"]), float(state["overtime_start"]), float(state["phase_start"]),
+        totals["day"], totals["postpones"], totals["work"], totals["rest"], totals["overtime"],
+        float(state.get("last_alive") or state["phase_start"]),
+    )
+
+
+def unpack_state(data):
+    """ Возвращает словарь состояния или None, если файл повреждён или чужой версии """
+    if len(data) == STATE_STRUCT_V1.size:
+        magic, version, mode_index, postponed, phase_end, overtime_start = STATE_STRUCT_V1.unpack(data)
+        phase_start, last_alive, totals = 0.0, 0.0, new_totals(0)
+        expected_version = 1
+    elif len(data) == STATE_STRUCT_V2.size:
+        (magic, version, mode_index, postponed, phase_end, overtime_start, phase_start,
+         day, postpones, work, rest, overtime) = STATE_STRUCT_V2.unpack(data)
+        totals = {"day": day, "postpones": postpones, "work": work, "rest": rest, "overtime": overtime}
+        last_alive = phase_start
+        expected_version = 2
+    elif len(data) == STATE_STRUCT.size:
+        (magic, version, mode_index, postponed, phase_end, overtime_start, phase_start,
+         day, postpones, work, rest, overtime, last_alive) = STATE_STRUCT.unpack(data)
+        totals = {"day": day, "postpones": postpones, "work": work, "rest": rest, "overtime": overtime}
+        expected_version = STATE_VERSION
+    else:
+        return None
+    if magic != STATE_MAGIC or version != expected_version or mode_index >= len(MODES):
+        return None
+    return {
+        "mode": MODES[mode_index],
+        "phase_end": phase_end,
+        "overtime_start": overtime_start,
+        "postponed_from_work": bool(postponed),
+        "phase_start": phase_start,
+        "totals": totals,
+        "last_alive": last_alive,
+    }
+
+
+def save_state(path, state):
+    """ Атомарная запись: временный файл + fsync + os.replace """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(pack_state(state))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def touch_state(path, ts):
+    """
+    Переписывает на месте только отметку last_alive. Без fsync и временного файла:
+    потеря этой записи при сбое лишь делает простой чуть длиннее, а фазу не портит.
+    """
+    if os.path.getsize(path) != STATE_STRUCT.size:
+        return  # Снимок старой версии — обновится при ближайшей смене фазы
+    with open(path, "r+b") as f:
+        f.seek(LAST_ALIVE_OFFSET)
+        f.write(struct.pack("<d", ts))
+
+
+def load_state(path):
+    try:
+        with open(path, "rb") as f:
+            return unpack_state(f.read(STATE_STRUCT.size + 1))
+    except OSError:
+        return None
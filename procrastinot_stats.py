@@ -0,0 +1,196 @@
+# procrastinot_stats.py
+# История фаз за всё время и сводки по ней.
+# Каждый закрытый отрезок фазы дописывается в три колоночных файла в state_dir()/stats:
+#   start.f8 — начало отрезка (time.time()), mode.u1 — код режима, duration.f4 — секунды.
+# Запись идёт через struct без NumPy (нужна на каждой смене фазы), а чтение —
+# через np.memmap, и все сводки считаются векторно (bincount по номеру дня/недели/месяца),
+# поэтому запросы по нескольким годам истории занимают миллисекунды.
+# Модуль не зависит от Qt; NumPy импортируется только при чтении.
+
+import os
+import time
+import struct
+
+from procrastinot_state import state_dir, MODES
+
+STATS_DIR = os.path.join(state_dir(), "stats")
+COLUMNS = (("start", "f8", "<d"), ("mode", "u1", "<B"), ("duration", "f4", "<f"))
+POSTPONED_FROM_WORK_BIT = 0x80  # Старший бит кода: отложена работа, а не отдых
+PERIODS = {"day": "Дни", "week": "Недели", "month": "Месяцы"}
+SECONDS_PER_DAY = 86400
+
+CODE_WORK, CODE_REST, CODE_POSTPONED, CODE_REST_PROMPT, CODE_WORK_PROMPT = range(5)
+
+
+def mode_code(mode, postponed_from_work=False):
+    code = MODES.index(mode)
+    if mode == "postponed" and postponed_from_work:
+        code |= POSTPONED_FROM_WORK_BIT
+    return code
+
+
+class StatsStore:
+    def __init__(self, path=STATS_DIR):
+        self.path = path
+
+    def _file(self, name, dtype):
+        return os.path.join(self.path, f"{name}.{dtype}")
+
+    def record(self, mode, postponed_from_work, start, end):
+        """ Дописывает отрезок фазы [start, end); сон вне активных часов не храним """
+        if end <= start or mode == "idle_inactive_hours":
+            return
+        values = (start, mode_code(mode, postponed_from_work), end - start)
+        os.makedirs(self.path, exist_ok=True)
+        for (name, dtype, fmt), value in zip(COLUMNS, values):
+            with open(self._file(name, dtype), "ab") as f:
+                f.write(struct.pack(fmt, value))
+
+    def load(self):
+        """
+        Колонки истории как массивы (memmap, без копирования). Если запись прервалась
+        посередине, лишний хвост отдельных колонок отбрасывается.
+        """
+        import numpy as np
+        sizes = []
+        for name, dtype, _ in COLUMNS:
+            try:
+                sizes.append(os.path.getsize(self._file(name, dtype)) // np.dtype(dtype).itemsize)
+            except OSError:
+                sizes.append(0)
+        count = min(sizes)
+        columns = []
+        for name, dtype, _ in COLUMNS:
+            if count:
+                columns.append(np.memmap(self._file(name, dtype), dtype=np.dtype(dtype).newbyteorder("<"),
+                                         mode="r", shape=(count,)))
+            else:
+                columns.append(np.empty(0, dtype=dtype))
+        return columns
+
+
+def _local_days(start):
+    """ Номер локального дня (от 1970-01-01) для каждой метки; смещение пояса считается по дню, не по записи """
+    import numpy as np
+    utc_days = np.floor(start / SECONDS_PER_DAY).astype(np.int64)
+    unique_days, inverse = np.unique(utc_days, return_inverse=True)
+    offsets = np.array([time.localtime(d * SECONDS_PER_DAY + SECONDS_PER_DAY // 2).tm_gmtoff
+                        for d in unique_days.tolist()], dtype=np.float64)
+    return np.floor((start + offsets[inverse]) / SECONDS_PER_DAY).astype(np.int64)
+
+
+def _period_keys(days, period):
+    """ Номер дня (от 1970-01-01) -> номер периода и функция, дающая дату начала периода """
+    import numpy as np
+    if period == "week":
+        return (days + 3) // 7, lambda k: (k * 7 - 3).astype("datetime64[D]")  # 1970-01-01 — четверг
+    if period == "month":
+        keys = days.astype("datetime64[D]").astype("datetime64[M]").astype(np.int64)
+        return keys, lambda k: k.astype("datetime64[M]").astype("datetime64[D]")
+    raise ValueError(f"неизвестный период {period}")
+
+
+def _empty_rollup():
+    import numpy as np
+    empty = np.empty(0)
+    return {"period": np.empty(0, dtype="datetime64[D]"), "work": empty, "rest": empty,
+            "overtime": empty, "postpones": empty, "prompts": empty}
+
+
+def daily_rollup(columns):
+    """
+    Итоги по дням: словарь массивов одинаковой длины — "period" (дата),
+    "work", "rest", "overtime" (секунды), "postpones" и "prompts" (число фаз).
+    Дни без записей внутри диапазона тоже присутствуют (с нулями).
+    Отрезок целиком относится к дню, в котором начался.
+    """
+    import numpy as np
+    start, code, duration = columns
+    if len(start) == 0:
+        return _empty_rollup()
+    start = np.asarray(start, dtype=np.float64)
+    code = np.asarray(code)
+    duration = np.asarray(duration, dtype=np.float64)
+
+    days = _local_days(start)
+    first = days.min()
+    bins = days - first
+    size = int(bins.max()) + 1
+
+    mode = code & (0xFF ^ POSTPONED_FROM_WORK_BIT)
+    from_work = (code & POSTPONED_FROM_WORK_BIT) != 0
+    postponed = mode == CODE_POSTPONED
+    prompt = (mode == CODE_REST_PROMPT) | (mode == CODE_WORK_PROMPT)
+    # Новая фаза — там, где код сменился; повторные отрезки одной фазы (скачок часов и т.п.) не считаем
+    new_phase = np.ones(len(code), dtype=bool)
+    new_phase[1:] = code[1:] != code[:-1]
+
+    def total(mask):
+        return np.bincount(bins, weights=np.where(mask, duration, 0.0), minlength=size)
+
+    return {
+        "period": np.arange(first, first + size).astype("datetime64[D]"),
+        "work": total((mode == CODE_WORK) | (postponed & ~from_work)),
+        "rest": total((mode == CODE_REST) | (postponed & from_work)),
+        "overtime": total(prompt),
+        "postpones": np.bincount(bins, weights=postponed & new_phase, minlength=size),
+        "prompts": np.bincount(bins, weights=prompt & new_phase, minlength=size),
+    }
+
+
+def extend_to(daily, day):
+    """ Дописывает к дневным итогам нулевые дни до day (дата) включительно; пустые итоги не трогает """
+    import numpy as np
+    if len(daily["period"]) == 0:
+        return daily
+    last = daily["period"][-1]
+    extra = int((np.datetime64(day, "D") - last).astype(np.int64))
+    if extra <= 0:
+        return daily
+    result = {"period": np.concatenate([daily["period"], last + np.arange(1, extra + 1)])}
+    for field in ("work", "rest", "overtime", "postpones", "prompts"):
+        result[field] = np.concatenate([daily[field], np.zeros(extra)])
+    return result
+
+
+def regroup(daily, period):
+    """ Сворачивает дневные итоги в недельные (с понедельника) или месячные """
+    import numpy as np
+    if period == "day" or len(daily["period"]) == 0:
+        return daily
+    keys, starts = _period_keys(daily["period"].astype(np.int64), period)
+    first = keys.min()
+    bins = keys - first
+    size = int(bins.max()) + 1
+    result = {"period": starts(np.arange(first, first + size))}
+    for field in ("work", "rest", "overtime", "postpones", "prompts"):
+        result[field] = np.bincount(bins, weights=daily[field], minlength=size)
+    return result
+
+
+def rollup(columns, period="day"):
+    """ Итоги по периодам из PERIODS, см. daily_rollup """
+    return regroup(daily_rollup(columns), period)
+
+
+def trends(daily, window=7):
+    """
+    Скользящие за window дней: средняя переработка в день (секунды) и доля
+    предложений, которые были отложены. На вход — результат daily_rollup().
+    """
+    import numpy as np
+
+    def rolling_sum(values):
+        cs = np.concatenate([[0.0], np.cumsum(values, dtype=np.float64)])
+        lagged = np.concatenate([np.zeros(window), cs])  # lagged[j] == cs[j - window]
+        return cs[1:] - lagged[1:len(cs)]
+
+    days_in_window = np.minimum(np.arange(1, len(daily["period"]) + 1), window)
+    prompts = rolling_sum(daily["prompts"])
+    with np.errstate(invalid="ignore", divide="ignore"):
+        postpone_rate = np.where(prompts > 0, rolling_sum(daily["postpones"]) / prompts, 0.0)
+    return {
+        "period": daily["period"],
+        "avg_overtime": rolling_sum(daily["overtime"]) / np.maximum(days_in_window, 1),
+        "postpone_rate": postpone_rate,
+    }
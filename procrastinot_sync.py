@@ -0,0 +1,293 @@
+# procrastinot_sync.py
+# Синхронизация состояния таймера между несколькими экземплярами ProcrastiNOT.
+# Модуль не зависит от Qt: клиент работает в своём потоке, а приложение
+# получает чужие изменения через колбэк.
+#
+# Протокол: одна JSON-строка на сообщение.
+#   {"v": 2, "node": "<id>", "f": {"timer": [["rest", 1700000000.0, 0, false], 17, "<id>"]}}
+# Состояние таймера (режим, конец фазы, начало переработки, postponed_from_work) —
+# один регистр с одной меткой (логические часы Лэмпорта, id узла): по отдельности
+# поля могли бы сойтись в состояние, которого не было ни на одном устройстве.
+# Конфликт решается по правилу "последний записавший побеждает"; часы Лэмпорта
+# сохраняются на диск, чтобы после перезапуска новые изменения не проигрывали старым.
+#
+# Ретранслятор запускается отдельно:
+#   python procrastinot_sync.py --host 0.0.0.0 --port 48765
+
+import os
+import sys
+import json
+import socket
+import socketserver
+import threading
+import argparse
+
+from procrastinot_state import state_dir
+
+PROTOCOL_VERSION = 2
+DEFAULT_SYNC_PORT = 48765
+TIMER_REGISTER = "timer"
+TIMER_FIELDS = ("mode", "phase_end", "overtime_start", "postponed_from_work")
+SYNC_FIELDS = (TIMER_REGISTER,)
+CLOCK_FILE = os.path.join(state_dir(), "sync.clock")
+
+RECONNECT_MIN_DELAY = 0.5
+RECONNECT_MAX_DELAY = 5.0
+
+
+def pack_timer(values):
+    """ Состояние таймера -> значение регистра (список в порядке TIMER_FIELDS) """
+    return [values[name] for name in TIMER_FIELDS]
+
+
+def unpack_timer(value):
+    """ Значение регистра -> словарь полей или None, если формат не тот """
+    if not isinstance(value, list) or len(value) != len(TIMER_FIELDS):
+        return None
+    return dict(zip(TIMER_FIELDS, value))
+
+
+def load_clock(path=CLOCK_FILE):
+    try:
+        with open(path, encoding="ascii") as f:
+            return int(f.read().strip() or 0)
+    except (OSError, ValueError):
+        return 0
+
+
+def save_clock(clock, path=CLOCK_FILE):
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="ascii") as f:
+            f.write(str(clock))
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"Не удалось сохранить часы синхронизации: {e}")
+
+
+class LWWState:
+    """ Набор LWW-регистров: для каждого регистра хранится значение и метка (clock, node) """
+    def __init__(self, clock=0):
+        self.values = {}
+        self.stamps = {}
+        self.clock = clock
+
+    def merge(self, fields):
+        """ Принимает {поле: [значение, clock, node]}, возвращает выигравшие поля """
+        accepted = {}
+        for name, entry in fields.items():
+            if name not in SYNC_FIELDS:
+                continue
+            try:
+                value, clock, node = entry
+                stamp = (int(clock), str(node))
+            except (TypeError, ValueError):
+                continue
+            self.clock = max(self.clock, stamp[0])
+            if name not in self.stamps or stamp > self.stamps[name]:
+                self.values[name] = value
+                self.stamps[name] = stamp
+                accepted[name] = [value, stamp[0], stamp[1]]
+        return accepted
+
+    def stamp_local(self, values, node):
+        """ Ставит новую метку на локально изменённые регистры, возвращает дельту """
+        changed = {k: v for k, v in values.items()
+                   if k in SYNC_FIELDS and (k not in self.values or self.values[k] != v)}
+        if not changed:
+            return {}
+        self.clock += 1
+        delta = {}
+        for name, value in changed.items():
+            self.values[name] = value
+            self.stamps[name] = (self.clock, node)
+            delta[name] = [value, self.clock, node]
+        return delta
+
+    def losers(self, fields):
+        """ Поля, по которым у нас более свежие данные, чем в пришедшем сообщении """
+        result = {}
+        for name, entry in fields.items():
+            if name not in self.stamps:
+                continue
+            try:
+                incoming = (int(entry[1]), str(entry[2]))
+            except (TypeError, ValueError, IndexError):
+                continue
+            if self.stamps[name] > incoming:
+                stamp = self.stamps[name]
+                result[name] = [self.values[name], stamp[0], stamp[1]]
+        return result
+
+    def snapshot(self):
+        return {name: [self.values[name], stamp[0], stamp[1]] for name, stamp in self.stamps.items()}
+
+
+def encode_message(node, fields):
+    return (json.dumps({"v": PROTOCOL_VERSION, "node": node, "f": fields},
+                       separators=(",", ":")) + "\n").encode("utf-8")
+
+
+def decode_message(line):
+    try:
+        msg = json.loads(line)
+    except ValueError:
+        return None
+    if not isinstance(msg, dict) or msg.get("v") != PROTOCOL_VERSION or not isinstance(msg.get("f"), dict):
+        return None
+    return msg
+
+
+class SyncClient:
+    """
+    Клиент синхронизации. Держит соединение с ретранслятором, переподключается
+    при обрыве и сразу после подключения обменивается полным состоянием.
+    on_remote_change(values) вызывается из фонового потока с полным состоянием таймера.
+    """
+    def __init__(self, node_id, host, port, on_remote_change, clock_path=CLOCK_FILE):
+        self.node_id = node_id
+        self.host = host
+        self.port = port
+        self.on_remote_change = on_remote_change
+        self.clock_path = clock_path
+        self.state = LWWState(load_clock(clock_path))
+        self._lock = threading.Lock()
+        self._sock = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="procrastinot-sync", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._close_socket()
+
+    def publish(self, values):
+        """ Отправляет состояние таймера целиком, если оно изменилось с прошлой публикации """
+        with self._lock:
+            delta = self.state.stamp_local({TIMER_REGISTER: pack_timer(values)}, self.node_id)
+            if delta:
+                save_clock(self.state.clock, self.clock_path)
+                self._send(delta)
+
+    def _send(self, fields):
+        # Вызывается под self._lock
+        if self._sock is None:
+            return  # Отправим полный снимок при следующем подключении
+        try:
+            self._sock.sendall(encode_message(self.node_id, fields))
+        except OSError:
+            self._close_socket()
+
+    def _close_socket(self):
+        sock, self._sock = self._sock, None
+        if sock is not None:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+                sock.close()
+            except OSError:
+                pass
+
+    def _run(self):
+        delay = RECONNECT_MIN_DELAY
+        while not self._stop.is_set():
+            try:
+                sock = socket.create_connection((self.host, self.port), timeout=5)
+            except OSError:
+                self._stop.wait(delay)
+                delay = min(delay * 2, RECONNECT_MAX_DELAY)
+                continue
+            delay = RECONNECT_MIN_DELAY
+            sock.settimeout(None)
+            with self._lock:
+                self._sock = sock
+                snapshot = self.state.snapshot()
+                if snapshot:
+                    self._send(snapshot)
+            try:
+                for line in sock.makefile("r", encoding="utf-8"):
+                    msg = decode_message(line)
+                    if msg is None:
+                        continue
+                    with self._lock:
+                        clock = self.state.clock
+                        accepted = self.state.merge(msg["f"])
+                        if self.state.clock != clock:
+                            save_clock(self.state.clock, self.clock_path)
+                    values = unpack_timer(accepted[TIMER_REGISTER][0]) if TIMER_REGISTER in accepted else None
+                    if values is not None:
+                        self.on_remote_change(values)
+            except (OSError, ValueError):
+                pass
+            with self._lock:
+                if self._sock is sock:
+                    self._close_socket()
+
+
+class _RelayHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        relay = self.server
+        with relay.lock:
+            relay.clients.add(self.wfile)
+            snapshot = relay.state.snapshot()
+            if snapshot:
+                self._write(self.wfile, encode_message("relay", snapshot))
+        try:
+            for raw in self.rfile:
+                msg = decode_message(raw.decode("utf-8", "replace"))
+                if msg is None:
+                    continue
+                # Пишем под общей блокировкой, чтобы строки разных потоков не перемешивались
+                with relay.lock:
+                    accepted = relay.state.merge(msg["f"])
+                    corrections = relay.state.losers(msg["f"])
+                    if accepted:
+                        data = encode_message(msg.get("node", ""), accepted)
+                        for wfile in relay.clients:
+                            if wfile is not self.wfile:
+                                self._write(wfile, data)
+                    if corrections:
+                        # Отправитель отстал (например, только что переподключился)
+                        self._write(self.wfile, encode_message("relay", corrections))
+        finally:
+            with relay.lock:
+                relay.clients.discard(self.wfile)
+
+    def _write(self, wfile, data):
+        try:
+            wfile.write(data)
+            wfile.flush()
+        except OSError:
+            pass
+
+
+class SyncRelay(socketserver.ThreadingTCPServer):
+    """ Минимальный ретранслятор: хранит последнее состояние и рассылает дельты """
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, host="127.0.0.1", port=DEFAULT_SYNC_PORT):
+        super().__init__((host, port), _RelayHandler)
+        self.lock = threading.Lock()
+        self.clients = set()
+        self.state = LWWState()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ретранслятор синхронизации ProcrastiNOT")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_SYNC_PORT)
+    args = parser.parse_args(argv)
+    with SyncRelay(args.host, args.port) as relay:
+        print(f"Ретранслятор слушает {args.host}:{args.port}")
+        try:
+            relay.serve_forever()
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,143 @@
+# procrastinot_tasks.py
+# Учёт времени по задачам/проектам за текущий день.
+# Имена задач интернируются в целочисленные id, а счётчики (работа, переработка,
+# отсрочки) лежат в компактных массивах array, проиндексированных этим id, —
+# поэтому обновление при смене фазы стоит O(1) даже при тысячах задач.
+# Модуль не зависит от Qt.
+
+import os
+import sys
+import time
+import heapq
+import struct
+from array import array
+from datetime import date
+
+from procrastinot_state import state_dir, local_day, phase_bucket
+
+TASKS_FILE = os.path.join(state_dir(), "tasks.bin")
+TASKS_MAGIC = b"PNTK"
+TASKS_VERSION = 1
+# magic, версия, день, число задач, текущая задача (-1 — нет), длина блока имён
+TASKS_HEADER = struct.Struct("<4sBxxxIIiI")
+NO_TASK = -1
+
+
+class TaskLedger:
+    def __init__(self, path=TASKS_FILE, day=None):
+        self.path = path
+        self.day = day if day is not None else local_day(time.time())
+        self.names = []
+        self.ids = {}
+        self.work = array("d")
+        self.overtime = array("d")
+        self.postpones = array("I")
+        self.current = NO_TASK
+        self.recent = []
+        self.dirty = 0
+
+    def intern(self, name):
+        """ id задачи по имени; новая задача получает следующий свободный id """
+        name = sys.intern(name.strip())
+        task_id = self.ids.get(name)
+        if task_id is None:
+            task_id = len(self.names)
+            self.ids[name] = task_id
+            self.names.append(name)
+            self.work.append(0.0)
+            self.overtime.append(0.0)
+            self.postpones.append(0)
+        return task_id
+
+    def select(self, task_id):
+        self.current = task_id
+        if task_id != NO_TASK:
+            if task_id in self.recent:
+                self.recent.remove(task_id)
+            self.recent.insert(0, task_id)
+            del self.recent[10:]
+        self.dirty += 1
+
+    def current_name(self):
+        return self.names[self.current] if self.current != NO_TASK else None
+
+    def _roll_day(self, day):
+        # Новый день: обнуляем счётчики, но сохраняем интернированные имена
+        count = len(self.names)
+        self.day = day
+        self.work = array("d", bytes(8 * count))
+        self.overtime = array("d", bytes(8 * count))
+        self.postpones = array("I", bytes(4 * count))
+
+    def account(self, mode, postponed_from_work, start, end):
+        """ Зачисляет отрезок фазы [start, end) текущей задаче (как account_phase для итогов дня) """
+        day = local_day(end)
+        if day != self.day:
+            self._roll_day(day)
+            start = max(start, time.mktime(date.fromordinal(day).timetuple()))
+        task_id = self.current
+        if task_id == NO_TASK or end <= start:
+            return
+        if phase_bucket(mode, postponed_from_work) == "work":
+            self.work[task_id] += end - start
+        elif mode == "rest_prompt":
+            # Переработку считаем только после работы; пропуск работы задаче не засчитывается
+            self.overtime[task_id] += end - start
+        self.dirty += 1
+
+    def add_postpone(self):
+        if self.current != NO_TASK:
+            self.postpones[self.current] += 1
+            self.dirty += 1
+
+    def top(self, n=10):
+        """ Задачи дня с наибольшим временем: (имя, работа, переработка, отсрочки) """
+        work, overtime = self.work, self.overtime
+        best = heapq.nlargest(n, range(len(self.names)), key=lambda i: work[i] + overtime[i])
+        return [(self.names[i], work[i], overtime[i], self.postpones[i])
+                for i in best if work[i] + overtime[i] > 0 or self.postpones[i]]
+
+    def save(self):
+        """ Атомарно сохраняет весь журнал; вызывается пачками, а не на каждое изменение """
+        names_blob = "\n".join(self.names).encode("utf-8")
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(TASKS_HEADER.pack(TASKS_MAGIC, TASKS_VERSION, self.day, len(self.names),
+                                      self.current, len(names_blob)))
+            f.write(names_blob)
+            self.work.tofile(f)
+            self.overtime.tofile(f)
+            self.postpones.tofile(f)
+            f.write(struct.pack(f"<B{len(self.recent)}i", len(self.recent), *self.recent))
+        os.replace(tmp_path, self.path)
+        self.dirty = 0
+
+    @classmethod
+    def load(cls, path=TASKS_FILE):
+        ledger = cls(path)
+        try:
+            with open(path, "rb") as f:
+                magic, version, day, count, current, names_len = TASKS_HEADER.unpack(f.read(TASKS_HEADER.size))
+                if magic != TASKS_MAGIC or version != TASKS_VERSION:
+                    return ledger
+                names = f.read(names_len).decode("utf-8").split("\n") if count else []
+                work, overtime, postpones = array("d"), array("d"), array("I")
+                work.fromfile(f, count)
+                overtime.fromfile(f, count)
+                postpones.fromfile(f, count)
+                (recent_len,) = struct.unpack("<B", f.read(1))
+                recent = list(struct.unpack(f"<{recent_len}i", f.read(4 * recent_len)))
+        except (OSError, EOFError, struct.error, UnicodeDecodeError):
+            return ledger
+        if len(names) != count:
+            return ledger
+        ledger.names = [sys.intern(n) for n in names]
+        ledger.ids = {name: i for i, name in enumerate(ledger.names)}
+        ledger.current = current if current < count else NO_TASK
+        ledger.recent = [i for i in recent if 0 <= i < count]
+        if day == ledger.day:
+            ledger.work, ledger.overtime, ledger.postpones = work, overtime, postpones
+        else:
+            ledger._roll_day(ledger.day)
+        return ledger
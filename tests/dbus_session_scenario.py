@@ -0,0 +1,106 @@
+# Сценарий для test_dbus_notifications.py: запускается под dbus-run-session.
+# На отдельном соединении с шиной регистрируется поддельный org.freedesktop.Notifications,
+# а настоящий FreedesktopNotificationBackend() ходит к нему через dbus-daemon, так что
+# проверяется и маршалинг аргументов (uint, as, a{sv}). Итог печатается одной строкой JSON.
+
+import os
+import sys
+import json
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PyQt6.QtCore import QCoreApplication, QObject, QThread, QMetaType, pyqtSlot, pyqtClassInfo  # noqa: E402
+from PyQt6.QtDBus import QDBusConnection, QDBusMessage, QDBusArgument  # noqa: E402
+
+SERVICE = "org.freedesktop.Notifications"
+PATH = "/org/freedesktop/Notifications"
+
+app = QCoreApplication([])
+calls = []
+
+
+@pyqtClassInfo("D-Bus Interface", SERVICE)
+class MockNotificationServer(QObject):
+    """ Строгие сигнатуры: при неверных типах аргументов вызов не найдёт метод и вернёт ошибку """
+    def __init__(self):
+        super().__init__()
+        self.next_id = 1
+
+    @pyqtSlot(str, "uint", str, str, str, "QStringList", "QVariantMap", int, result="uint")
+    def Notify(self, app_name, replaces_id, icon, summary, body, actions, hints, timeout):
+        calls.append({"method": "Notify", "app_name": app_name, "replaces_id": replaces_id, "summary": summary,
+                      "body": body, "actions": list(actions), "hints": dict(hints), "timeout": timeout})
+        if replaces_id:
+            return replaces_id
+        self.next_id += 1
+        return self.next_id - 1
+
+    @pyqtSlot("uint")
+    def CloseNotification(self, notification_id):
+        calls.append({"method": "CloseNotification", "id": notification_id})
+
+
+def emit(name, *args):
+    message = QDBusMessage.createSignal(PATH, SERVICE, name)
+    message.setArguments([QDBusArgument(args[0], QMetaType.Type.UInt.value)] + list(args[1:]))
+    server_bus.send(message)
+
+
+def wait_for(predicate, what, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            raise SystemExit(f"не дождались: {what}; вызовы: {calls}")
+        app.processEvents()
+        time.sleep(0.005)
+
+
+# Сервер на своём соединении — иначе QtDBus доставил бы вызовы локально, минуя шину, —
+# и в своём потоке: QDBusInterface при создании синхронно запрашивает интроспекцию
+server_bus = QDBusConnection.connectToBus(QDBusConnection.BusType.SessionBus, "mock-notification-server")
+server_thread = QThread()
+server_thread.start()
+server = MockNotificationServer()
+server.moveToThread(server_thread)
+if not server_bus.registerService(SERVICE) or not server_bus.registerObject(
+        PATH, server, QDBusConnection.RegisterOption.ExportAllSlots):
+    raise SystemExit("не удалось зарегистрировать поддельный сервер уведомлений")
+
+from ProcrastiNOT import FreedesktopNotificationBackend  # noqa: E402
+
+backend = FreedesktopNotificationBackend()
+pressed, closed = [], []
+
+
+def buttons(*ids):
+    return [{"id": i, "text": i, "command": (lambda i=i: pressed.append(i))} for i in ids]
+
+
+started = time.monotonic()
+first = backend.show("rest_prompt", "Пора отдохнуть!", "00:00", buttons("start_rest", "postpone_rest"),
+                     is_persistent=True)
+show_ms = (time.monotonic() - started) * 1000
+wait_for(lambda: backend.notification_id, "id первого уведомления")
+first_id = backend.notification_id
+
+second = backend.show("work_prompt", "Пора работать!", "00:00", buttons("start_work", "postpone_work"),
+                      is_persistent=True)
+wait_for(lambda: len(calls) == 2 and not backend.notify_in_flight, "замена уведомления")
+
+emit("ActionInvoked", first_id, "postpone_work")
+wait_for(lambda: pressed, "нажатие кнопки")
+
+second.closed.connect(lambda: closed.append(True))
+emit("NotificationClosed", first_id, 2)
+wait_for(lambda: closed, "закрытие сервером")
+
+third = backend.show("work", "Работа", "75:00", timeout_ms=5000)
+wait_for(lambda: len(calls) == 3 and not backend.notify_in_flight, "третье уведомление")
+third.close()
+wait_for(lambda: calls[-1]["method"] == "CloseNotification", "CloseNotification")
+
+server_thread.quit()
+server_thread.wait()
+print(json.dumps({"calls": calls, "first_id": first_id, "pressed": pressed, "show_ms": show_ms},
+                 ensure_ascii=False))
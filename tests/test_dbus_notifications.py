@@ -0,0 +1,184 @@
+# Тесты FreedesktopNotificationBackend против поддельного сервера уведомлений.
+# Большая часть обходится без шины: вызовы _call_async уходят в MockNotificationServer.
+# test_real_session_bus запускает dbus_session_scenario.py под dbus-run-session и
+# проверяет настоящий путь через dbus-daemon, включая маршалинг аргументов.
+
+import os
+import sys
+import json
+import shutil
+import subprocess
+
+import pytest
+
+# Без exc_type pytest >= 8.2 пропускает только ModuleNotFoundError, а QtMultimedia
+# без libpulse падает с ImportError
+pytest.importorskip("PyQt6.QtDBus", exc_type=ImportError)
+pytest.importorskip("PyQt6.QtMultimedia", exc_type=ImportError)
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PyQt6.QtCore import QCoreApplication  # noqa: E402
+
+import ProcrastiNOT  # noqa: E402
+from ProcrastiNOT import FreedesktopNotificationBackend, DBUS_TIMER_UPDATE_SECONDS  # noqa: E402
+
+
+class MockNotificationServer:
+    """ Ведёт себя как org.freedesktop.Notifications: выдаёт id, запоминает вызовы """
+    def __init__(self):
+        self.calls = []
+        self.replies = []  # Ответы, которые ещё не доставлены клиенту
+        self.next_id = 1
+        self.visible = {}
+
+    def handle(self, method, args, on_reply):
+        self.calls.append((method, args))
+        if method == "Notify":
+            replaces_id = args[1]
+            notification_id = replaces_id or self.next_id
+            if not replaces_id:
+                self.next_id += 1
+            self.visible[notification_id] = (args[3], args[4])
+            if on_reply:
+                self.replies.append((on_reply, notification_id))
+        elif method == "CloseNotification":
+            self.visible.pop(args[0], None)
+
+    def deliver(self):
+        replies, self.replies = self.replies, []
+        for on_reply, value in replies:
+            on_reply(value, None)
+
+    def methods(self):
+        return [method for method, _ in self.calls]
+
+
+class FakeBus:
+    def connect(self, *args):
+        return True
+
+    def isConnected(self):
+        return True
+
+
+class FakeInterface:
+    def isValid(self):
+        return True
+
+
+class FakeMessage:
+    def __init__(self, *args):
+        self._args = list(args)
+
+    def arguments(self):
+        return self._args
+
+
+class MockedBackend(FreedesktopNotificationBackend):
+    def __init__(self, server):
+        super().__init__(bus=FakeBus(), interface=FakeInterface())
+        self.server = server
+
+    def _call_async(self, method, *args, on_reply=None):
+        self.server.handle(method, args, on_reply)
+
+    def _uint(self, value):
+        return value
+
+
+@pytest.fixture
+def server():
+    app = QCoreApplication.instance() or QCoreApplication([])
+    assert app is not None
+    return MockNotificationServer()
+
+
+@pytest.fixture
+def backend(server):
+    return MockedBackend(server)
+
+
+def buttons(*ids):
+    pressed = []
+    return [{"id": i, "text": i, "command": (lambda i=i: pressed.append(i))} for i in ids], pressed
+
+
+def test_transient_notification_is_not_refreshed_every_second(backend, server):
+    notification = backend.show("work", "Работа", "75:00", is_persistent=False, timeout_ms=5000)
+    server.deliver()
+    for second in range(10):
+        notification.update_timer(f"74:{59 - second:02d}")
+    assert server.methods() == ["Notify"]
+
+
+def test_persistent_notification_is_refreshed_at_most_once_a_minute(backend, server, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(ProcrastiNOT.time, "monotonic", lambda: now[0])
+    config, _ = buttons("start_rest")
+    notification = backend.show("rest_prompt", "Пора отдохнуть!", "00:00", config, is_persistent=True)
+    server.deliver()
+    for second in range(1, 2 * DBUS_TIMER_UPDATE_SECONDS):
+        now[0] += 1
+        notification.update_timer(f"{second // 60:02d}:{second % 60:02d}")
+        server.deliver()
+    assert server.methods().count("Notify") == 2
+    assert server.calls[1][1][1] == 1  # replaces_id того же уведомления
+    assert server.visible == {1: ("Пора отдохнуть!", "01:00")}
+
+
+def test_replacement_waits_for_the_id_of_the_first_notify(backend, server):
+    backend.show("work", "Работа", "75:00")
+    backend.show("rest_prompt", "Пора отдохнуть!", "00:00", is_persistent=True)
+    assert server.methods() == ["Notify"]  # Второй Notify ждёт id первого
+    server.deliver()
+    server.deliver()
+    assert server.methods() == ["Notify", "Notify"]
+    assert server.calls[1][1][1] == 1
+    assert list(server.visible) == [1]
+
+
+def test_close_before_reply_closes_the_right_notification(backend, server):
+    notification = backend.show("work", "Работа", "75:00")
+    notification.close()
+    assert server.methods() == ["Notify"]
+    server.deliver()
+    assert server.methods() == ["Notify", "CloseNotification"]
+    assert server.visible == {}
+
+
+def test_actions_and_server_close(backend, server):
+    config, pressed = buttons("start_rest", "postpone_rest")
+    notification = backend.show("rest_prompt", "Пора отдохнуть!", "00:00", config, is_persistent=True)
+    server.deliver()
+    closed = []
+    notification.closed.connect(lambda: closed.append(True))
+    backend._on_action_invoked(FakeMessage(1, "postpone_rest"))
+    backend._on_action_invoked(FakeMessage(99, "start_rest"))  # Чужое уведомление
+    assert pressed == ["postpone_rest"]
+    backend._on_notification_closed(FakeMessage(1, 2))
+    assert closed == [True] and not notification.alive
+
+
+SCENARIO = os.path.join(os.path.dirname(os.path.abspath(__file__)), "dbus_session_scenario.py")
+
+
+@pytest.mark.skipif(not shutil.which("dbus-run-session") or not shutil.which("dbus-daemon"),
+                    reason="dbus-daemon не установлен")
+def test_real_session_bus():
+    result = subprocess.run(["dbus-run-session", "--", sys.executable, SCENARIO],
+                            capture_output=True, text=True, timeout=60)
+    assert result.returncode == 0, result.stdout + result.stderr
+    report = json.loads(result.stdout.strip().splitlines()[-1])
+    calls, first_id = report["calls"], report["first_id"]
+    assert [call["method"] for call in calls] == ["Notify", "Notify", "Notify", "CloseNotification"]
+    first, replacement, transient, close = calls
+    assert first["replaces_id"] == 0 and first_id
+    assert first["actions"] == ["start_rest", "start_rest", "postpone_rest", "postpone_rest"]
+    assert first["hints"] == {"resident": True} and first["timeout"] == 0
+    assert first["summary"] == "Пора отдохнуть!" and first["body"] == "00:00"
+    assert replacement["replaces_id"] == first_id  # То же окно, а не второе уведомление
+    assert transient["hints"] == {"resident": False} and transient["timeout"] == 5000
+    assert close["id"] == first_id
+    assert report["pressed"] == ["postpone_work"]
+    assert report["show_ms"] < 100  # show() не ждёт ответа сервера
@@ -0,0 +1,78 @@
+# Тесты снимка состояния: отметка last_alive и продолжение фазы после сбоя или перезагрузки.
+
+import os
+import sys
+import time
+import types
+
+import pytest
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from procrastinot_state import save_state, load_state, touch_state, new_totals, local_day  # noqa: E402
+
+MINUTE = 60
+
+
+def snapshot(now, mode="work", phase_start=None, phase_end=None, last_alive=None):
+    return {
+        "mode": mode,
+        "phase_end": phase_end if phase_end is not None else now + 55 * MINUTE,
+        "overtime_start": 0.0,
+        "postponed_from_work": False,
+        "phase_start": phase_start if phase_start is not None else now - 20 * MINUTE,
+        "totals": new_totals(local_day(now)),
+        "last_alive": last_alive if last_alive is not None else now,
+    }
+
+
+def test_touch_state_updates_only_last_alive(tmp_path):
+    path = str(tmp_path / "timer.state")
+    now = time.time()
+    save_state(path, snapshot(now, last_alive=now - 5 * MINUTE))
+    touch_state(path, now)
+    state = load_state(path)
+    assert state["last_alive"] == now
+    assert state["phase_end"] == now + 55 * MINUTE
+    assert state["phase_start"] == now - 20 * MINUTE
+
+
+@pytest.fixture
+def restoring_app(tmp_path, monkeypatch):
+    """ ProductivityApp без виджетов: только то, что нужно _restore_state """
+    pytest.importorskip("PyQt6.QtMultimedia", exc_type=ImportError)
+    import ProcrastiNOT
+    path = str(tmp_path / "timer.state")
+    monkeypatch.setattr(ProcrastiNOT, "STATE_FILE", path)
+    now = time.time()
+    app = ProcrastiNOT.ProductivityApp.__new__(ProcrastiNOT.ProductivityApp)
+    app.clock = types.SimpleNamespace(now=lambda: now)
+    # Конец активных часов заведомо далеко от проверяемых интервалов
+    end_hour = (time.localtime(now).tm_hour + 12) % 24
+    app.config_manager = types.SimpleNamespace(long_suspend_minutes=10, active_end_hour=end_hour)
+    app.current_mode = "work"
+    app.current_phase_end_time = app.overtime_start_time = 0
+    app.postponed_from_work = False
+    app.phase_start_time = now
+    app.today_totals = new_totals(local_day(now))
+    return app, path, now
+
+
+def test_mid_phase_snapshot_survives_crash(restoring_app):
+    # Фаза работы идёт 20 минут, приложение упало полминуты назад и сразу запущено снова
+    app, path, now = restoring_app
+    save_state(path, snapshot(now, last_alive=now - 30))
+    assert app._restore_state()
+    assert app.current_mode == "work"
+    assert app.current_phase_end_time - now == 55 * MINUTE
+    assert app.phase_start_time == now - 20 * MINUTE
+
+
+def test_long_downtime_starts_a_fresh_phase(restoring_app):
+    app, path, now = restoring_app
+    save_state(path, snapshot(now, phase_start=now - 3 * 60 * MINUTE, phase_end=now - 60 * MINUTE,
+                              last_alive=now - 2 * 60 * MINUTE))
+    assert not app._restore_state()
+    assert app.current_mode == "work"
+    assert app.current_phase_end_time == 0